@@ -95,24 +95,49 @@ def remove_repo_from_pre_commit_config(repo_to_remove: str):
 def remove_celery_files():
     file_paths = [
         Path("config", "celery_app.py"),
+        Path("config", "batching.py"),
+        Path("config", "enqueue.py"),
+        Path("benchmarks", "celery_results.py"),
         Path("{{ cookiecutter.project_slug }}", "apps", "users", "tasks.py"),
         Path("{{ cookiecutter.project_slug }}", "apps", "users", "tests", "test_tasks.py"),
+        Path("{{ cookiecutter.project_slug }}", "apps", "users", "tests", "test_celery_app.py"),
+        Path("{{ cookiecutter.project_slug }}", "apps", "users", "tests", "test_batching.py"),
+        Path("{{ cookiecutter.project_slug }}", "apps", "users", "tests", "test_enqueue.py"),
     ]
     for file_path in file_paths:
         if file_path.exists():
             file_path.unlink()
+    shutil.rmtree(Path("{{ cookiecutter.project_slug }}", "apps", "outbox"))
 
 
 def remove_async_files():
     file_paths = [
         Path("config", "asgi.py"),
         Path("config", "websocket.py"),
+        Path("config", "lifespan.py"),
+        Path("config", "async_views.py"),
+        Path("benchmarks", "websocket_load.py"),
+        Path("benchmarks", "users_api.py"),
     ]
     for file_path in file_paths:
         if file_path.exists():
             file_path.unlink()
 
 
+def remove_staticfiles_module():
+    Path("config", "staticfiles.py").unlink()
+
+
+def remove_uploads_module():
+    Path("config", "uploads.py").unlink()
+    Path("{{ cookiecutter.project_slug }}", "apps", "users", "tests", "test_uploads.py").unlink()
+
+
+def remove_syncstatic_command():
+    Path("{{ cookiecutter.project_slug }}", "apps", "users", "management", "commands", "syncstatic.py").unlink()
+    Path("{{ cookiecutter.project_slug }}", "apps", "users", "tests", "test_syncstatic.py").unlink()
+
+
 def remove_docs_files():
     """Remove documentation folder for pure API template."""
     docs_dir = Path("docs")
@@ -416,6 +441,18 @@ def main():  # noqa: C901, PLR0912, PLR0915
     if "{{ cookiecutter.use_channels }}".lower() == "n":
         remove_channel_files()
 
+    # config/staticfiles.py only has static storages for AWS, GCP and Azure. DigitalOcean and "None" keep
+    # static files on the local filesystem, so without WhiteNoise they need neither it nor syncstatic.
+    static_cloud = "{{ cookiecutter.cloud_provider }}" in ("AWS", "GCP", "Azure")
+    if "{{ cookiecutter.use_whitenoise }}".lower() == "n" and not static_cloud:
+        remove_staticfiles_module()
+
+    if "{{ cookiecutter.use_whitenoise }}".lower() == "y" or not static_cloud:
+        remove_syncstatic_command()
+
+    if "{{ cookiecutter.cloud_provider }}" != "AWS":
+        remove_uploads_module()
+
     if "{{ cookiecutter.monitoring }}".lower() == "none":
         remove_prometheus_grafana_files()
 
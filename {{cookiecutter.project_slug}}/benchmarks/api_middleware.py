@@ -0,0 +1,87 @@
+"""
+Per-request cost of the middleware skipped on API routes.
+
+Sends ``--requests`` GET requests to an API view that does nothing, once
+through the full WSGI handler and once through ``APIWSGIHandler``, the one
+``config.wsgi`` uses for API paths, and reports the mean time per request of
+each and the difference. No database or server is needed::
+
+    python -m benchmarks.api_middleware --requests 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import django
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "{{ cookiecutter.project_slug }}"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.test")
+os.environ.setdefault("DATABASE_URL", "postgres:///benchmark")
+django.setup()
+
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import path  # noqa: E402
+from rest_framework.response import Response  # noqa: E402
+from rest_framework.views import APIView  # noqa: E402
+
+from config.handlers import APIWSGIHandler  # noqa: E402
+
+
+class EmptyView(APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    def get(self, request):
+        return Response({})
+
+
+urlconf = SimpleNamespace(urlpatterns=[path("api/empty/", EmptyView.as_view())])
+
+
+def measure(handler, requests: int) -> float:
+    factory = RequestFactory()
+
+    def start_response(status, headers):
+        if not status.startswith("200"):
+            msg = f"GET /api/empty/ returned {status}"
+            raise RuntimeError(msg)
+
+    elapsed = 0.0
+    for _ in range(requests):
+        environ = factory.get("/api/empty/").environ
+        started = time.perf_counter()
+        b"".join(handler(environ, start_response))
+        elapsed += time.perf_counter() - started
+    return elapsed / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=10000)
+    options = parser.parse_args()
+
+    # Allows the "testserver" host.
+    setup_test_environment()
+    handlers = [("full", WSGIHandler()), ("api", APIWSGIHandler())]
+    write = sys.stdout.write
+    results = {}
+    with override_settings(ROOT_URLCONF=urlconf):
+        for name, handler in handlers:
+            # Warm up imports and the URL resolver before measuring.
+            measure(handler, 100)
+            results[name] = measure(handler, options.requests)
+            write(f"{name:<5} {results[name] * 1e6:8.1f} us/request\n")
+    saved = results["full"] - results["api"]
+    write(f"saved {saved * 1e6:8.1f} us/request ({saved / results['full']:.0%})\n")
+
+
+if __name__ == "__main__":
+    main()
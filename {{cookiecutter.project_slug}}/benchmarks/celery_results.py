@@ -0,0 +1,128 @@
+"""
+Enqueue latency and Redis memory of Celery tasks.
+
+Sends ``--tasks`` tasks, each carrying ``--rows`` rows of user data, to a
+queue of their own consumed by a worker started in-process. It reports the
+p50/p99 time ``apply_async`` took, how many results were stored and their
+size in Redis, and the growth of Redis' ``used_memory`` over the run. The
+settings decide whether results are stored; ``--store-result`` opts in the
+way a task would, and ``--serializer`` and ``--compression`` change the
+message format. It needs Redis at ``REDIS_URL`` and deletes the results it
+created::
+
+    python -m benchmarks.celery_results --tasks 5000 --rows 100
+    python -m benchmarks.celery_results --tasks 5000 --rows 100 --store-result \\
+        --serializer msgpack --compression zlib
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import django
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "{{ cookiecutter.project_slug }}"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.test")
+os.environ.setdefault("DATABASE_URL", "postgres:///benchmark")
+django.setup()
+
+import redis  # noqa: E402
+from celery.contrib.testing.worker import start_worker  # noqa: E402
+from celery.signals import task_postrun  # noqa: E402
+
+from config.celery_app import app  # noqa: E402
+
+QUEUE = "benchmark"
+WARM_UP_TASKS = 20
+# Seconds to wait for the worker to finish a task before giving up.
+TASK_TIMEOUT = 60
+
+
+@app.task(name="benchmarks.celery_results.echo")
+def echo(rows):
+    return rows
+
+
+def make_rows(count: int) -> list[dict]:
+    return [
+        {
+            "id": pk,
+            "username": f"user{pk}",
+            "email": f"user{pk}@example.com",
+            "score": pk / 7,
+        }
+        for pk in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--store-result", action="store_true")
+    parser.add_argument("--serializer", choices=["json", "msgpack"])
+    parser.add_argument("--compression", choices=["zlib", "gzip", "bzip2", "zstd"])
+    options = parser.parse_args()
+
+    client = redis.Redis.from_url(app.conf.broker_url)
+    finished = threading.Semaphore(0)
+    task_postrun.connect(lambda **kwargs: finished.release(), sender=echo, weak=False)
+    send_options = {"queue": QUEUE}
+    if options.store_result:
+        send_options["ignore_result"] = False
+    if options.serializer:
+        send_options["serializer"] = options.serializer
+    if options.compression:
+        send_options["compression"] = options.compression
+    rows = make_rows(options.rows)
+
+    def run(tasks: int) -> tuple[list[float], list[str]]:
+        latencies = []
+        task_ids = []
+        for _ in range(tasks):
+            started = time.perf_counter()
+            result = echo.apply_async((rows,), **send_options)
+            latencies.append(time.perf_counter() - started)
+            task_ids.append(result.id)
+        for _ in range(tasks):
+            if not finished.acquire(timeout=TASK_TIMEOUT):
+                msg = "The worker stopped processing tasks"
+                raise RuntimeError(msg)
+        return latencies, task_ids
+
+    with start_worker(app, pool="solo", queues=[QUEUE], perform_ping_check=False):
+        # Connect to the broker and backend before measuring.
+        _, task_ids = run(WARM_UP_TASKS)
+        memory_before = client.info("memory")["used_memory"]
+        latencies, measured_ids = run(options.tasks)
+        memory_after = client.info("memory")["used_memory"]
+    task_ids += measured_ids
+
+    keys = [app.backend.get_key_for_task(task_id) for task_id in measured_ids]
+    with client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.memory_usage(key)
+        sizes = [size for size in pipe.execute() if size is not None]
+    client.delete(*[app.backend.get_key_for_task(task_id) for task_id in task_ids])
+
+    write = sys.stdout.write
+    cuts = statistics.quantiles(latencies, n=100)
+    write(f"enqueue  p50 {cuts[49] * 1e6:8.1f} us  p99 {cuts[98] * 1e6:8.1f} us\n")
+    if sizes:
+        write(
+            f"results  {len(sizes)} stored, "
+            f"{statistics.mean(sizes):.0f} bytes each in Redis\n",
+        )
+    else:
+        write("results  none stored\n")
+    growth = (memory_after - memory_before) / 1024
+    write(f"memory   {growth:+.0f} KiB used_memory over {options.tasks} tasks\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Sync vs async throughput of the users API.
+
+Serves ``UserViewSet`` and ``AsyncUserViewSet`` in turn through Django's ASGI
+handler, as uvicorn would, and fires ``--requests`` authenticated requests
+at each endpoint with ``--concurrency`` of them in flight. The sync viewset
+runs in Django's sync thread; the async one on the event loop.
+
+It runs against a throwaway test database (``test_`` + the name in
+``DATABASE_URL``), created and dropped by the run::
+
+    python -m benchmarks.users_api --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import django
+from asgiref.sync import sync_to_async
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "{{ cookiecutter.project_slug }}"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.test")
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test import AsyncClient  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import include  # noqa: E402
+from django.urls import path  # noqa: E402
+from rest_framework.routers import SimpleRouter  # noqa: E402
+
+from config.authentication import RefreshToken  # noqa: E402
+from {{ cookiecutter.project_slug }}.users.api.views import AsyncUserViewSet  # noqa: E402
+from {{ cookiecutter.project_slug }}.users.api.views import UserViewSet  # noqa: E402
+from {{ cookiecutter.project_slug }}.users.models import User  # noqa: E402
+
+
+def urlconf(viewset):
+    router = SimpleRouter()
+    router.register("users", viewset)
+    return SimpleNamespace(urlpatterns=[path("api/", include((router.urls, "api")))])
+
+
+def percentiles(samples: list[float]) -> str:
+    cuts = statistics.quantiles(samples, n=100)
+    return f"p50 {cuts[49] * 1000:6.2f} ms  p99 {cuts[98] * 1000:6.2f} ms"
+
+
+async def measure(client, method: str, url: str, options, **kwargs):
+    latencies = []
+    remaining = iter(range(options.requests))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await getattr(client, method)(url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:  # noqa: PLR2004
+                msg = f"{method.upper()} {url} returned {response.status_code}"
+                raise RuntimeError(msg)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(options.concurrency)))
+    elapsed = time.perf_counter() - started
+    return options.requests / elapsed, percentiles(latencies)
+
+
+async def run(options, user: User):
+    token = str(RefreshToken.for_user(user).access_token)
+    client = AsyncClient(headers={"Authorization": f"Bearer {token}"})
+    {%- if cookiecutter.username_type == "email" %}
+    detail = f"/api/users/{user.pk}/"
+    {%- else %}
+    detail = f"/api/users/{user.username}/"
+    {%- endif %}
+    endpoints = [
+        ("me", "get", "/api/users/me/", {}),
+        ("retrieve", "get", detail, {}),
+        ("list", "get", "/api/users/", {}),
+        (
+            "update",
+            "patch",
+            detail,
+            {"data": {"name": "Benchmark"}, "content_type": "application/json"},
+        ),
+    ]
+    write = sys.stdout.write
+    for name, method, url, kwargs in endpoints:
+        for variant, viewset in [("sync", UserViewSet), ("async", AsyncUserViewSet)]:
+            with override_settings(ROOT_URLCONF=urlconf(viewset)):
+                # Warm up caches and connections before measuring.
+                await getattr(client, method)(url, **kwargs)
+                rate, latency = await measure(client, method, url, options, **kwargs)
+            write(f"{name:<9} {variant:<6} {rate:8.0f} req/s  {latency}\n")
+    # Let the test database be dropped.
+    await sync_to_async(connections.close_all)()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    options = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        user = User.objects.create_user(
+            {%- if cookiecutter.username_type == "username" %}
+            username="benchmark",
+            {%- endif %}
+            email="benchmark@example.com",
+            password=None,
+        )
+        asyncio.run(run(options, user))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
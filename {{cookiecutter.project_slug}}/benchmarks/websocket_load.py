@@ -0,0 +1,295 @@
+"""
+Websocket load test for ``config.asgi`` and ``config.websocket``.
+
+Starts the ASGI application under uvicorn in a child process, opens
+``--connections`` sockets against it, subscribes them all to one topic and
+then, for ``--duration`` seconds, has every socket ping the server while the
+server broadcasts to the topic. It reports:
+
+- connection setup rate,
+- p50/p99 round-trip latency of ``ping``/``pong!``,
+- p50/p99 delivery latency of broadcast events,
+- server RSS per 1k open connections.
+
+Redis is replaced by an in-memory pub/sub inside the server process, so
+nothing but this machine is needed::
+
+    ulimit -n 65536
+    python -m benchmarks.websocket_load --connections 5000
+
+The client runs in a single process; when its CPU is saturated, latencies
+measure the client rather than the server, so compare runs with the same
+arguments only.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+import uvicorn
+from websockets.asyncio.client import connect
+
+TOPIC = "bench"
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+class MemoryPubSub:
+    """The subset of ``redis.asyncio.client.PubSub`` used by ``TopicHub``."""
+
+    def __init__(self, broker: "MemoryRedis"):
+        self.broker = broker
+        self.channels: set[str] = set()
+        self.messages: asyncio.Queue[dict] = asyncio.Queue()
+
+    async def subscribe(self, *channels: str):
+        self.channels.update(channels)
+        self.broker.pubsubs.add(self)
+
+    async def unsubscribe(self, *channels: str):
+        self.channels.difference_update(channels)
+
+    async def get_message(self, timeout: float):  # noqa: ASYNC109
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except TimeoutError:
+            return None
+
+    async def aclose(self):
+        self.broker.pubsubs.discard(self)
+
+
+class MemoryRedis:
+    """Stand-in for the Redis server, local to one process."""
+
+    def __init__(self):
+        self.pubsubs: set[MemoryPubSub] = set()
+
+    def pubsub(self, **kwargs) -> MemoryPubSub:
+        return MemoryPubSub(self)
+
+    async def publish(self, channel: str, data: str) -> int:
+        receivers = [pubsub for pubsub in self.pubsubs if channel in pubsub.channels]
+        message = {
+            "type": "message",
+            "channel": channel.encode(),
+            "data": data.encode(),
+        }
+        for pubsub in receivers:
+            pubsub.messages.put_nowait(message)
+        return len(receivers)
+
+
+def raise_open_files_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def rss_bytes(pid: int) -> int:
+    with Path(f"/proc/{pid}/status").open() as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def percentiles(samples: list[float]) -> str:
+    if len(samples) < 2:  # noqa: PLR2004
+        return "n/a"
+    cuts = statistics.quantiles(samples, n=100)
+    return f"p50 {cuts[49] * 1000:.2f} ms, p99 {cuts[98] * 1000:.2f} ms"
+
+
+# Server
+# ------------------------------------------------------------------------------
+# Django is only loaded in the server process.
+async def broadcast(rate: float):
+    from config.websocket import apublish  # noqa: PLC0415
+
+    while True:
+        # time.monotonic() is system-wide on Linux, so the client can compare it.
+        await apublish(TOPIC, {"sent": time.monotonic()})
+        await asyncio.sleep(1 / rate)
+
+
+async def serve(options):
+    from config.asgi import application  # noqa: PLC0415
+    from config.websocket import hub  # noqa: PLC0415
+
+    hub._redis = MemoryRedis()  # noqa: SLF001
+    config = uvicorn.Config(
+        application,
+        host="127.0.0.1",
+        port=options.port,
+        lifespan="off",
+        log_level="warning",
+        backlog=4096,
+    )
+    publisher = asyncio.create_task(broadcast(options.broadcast_rate))
+    try:
+        await uvicorn.Server(config).serve()
+    finally:
+        publisher.cancel()
+
+
+def start_server(options) -> subprocess.Popen:
+    env = {
+        "DJANGO_SETTINGS_MODULE": "config.settings.test",
+        "DATABASE_URL": "postgres:///benchmark",
+        **os.environ,
+        "DJANGO_WEBSOCKET_MAX_CONNECTIONS": str(options.connections + 1),
+        "DJANGO_WEBSOCKET_IDLE_TIMEOUT": "0",
+        "DJANGO_WEBSOCKET_MAX_MESSAGES_PER_SECOND": "1000",
+    }
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.websocket_load",
+        "--serve",
+        f"--port={options.port}",
+        f"--broadcast-rate={options.broadcast_rate}",
+    ]
+    server = subprocess.Popen(command, cwd=BASE_DIR, env=env)  # noqa: S603
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            msg = f"Server exited with status {server.returncode}"
+            raise RuntimeError(msg)
+        try:
+            socket.create_connection(("127.0.0.1", options.port), timeout=1).close()
+        except OSError:
+            time.sleep(0.1)
+        else:
+            return server
+    server.kill()
+    msg = "Server did not start within 30 seconds"
+    raise RuntimeError(msg)
+
+
+# Client
+# ------------------------------------------------------------------------------
+class Client:
+    def __init__(self, websocket, results: dict[str, list[float]]):
+        self.websocket = websocket
+        self.results = results
+        self.pings: deque[float] = deque()
+        self.subscribed = asyncio.Event()
+
+    async def read_loop(self):
+        async for text in self.websocket:
+            now = time.monotonic()
+            if text == "pong!":
+                self.results["ping"].append(now - self.pings.popleft())
+                continue
+            message = json.loads(text)
+            if message["type"] == "event":
+                self.results["broadcast"].append(now - message["payload"]["sent"])
+            elif message["type"] == "subscribed":
+                self.subscribed.set()
+
+    async def ping_loop(self, delay: float, interval: float, until: float):
+        await asyncio.sleep(delay)
+        while time.monotonic() < until:
+            self.pings.append(time.monotonic())
+            await self.websocket.send("ping")
+            await asyncio.sleep(interval)
+
+
+async def run(options, server: subprocess.Popen):
+    url = f"ws://127.0.0.1:{options.port}/ws/"
+    results: dict[str, list[float]] = {"ping": [], "broadcast": []}
+    clients: list[Client] = []
+    readers = []
+    slots = asyncio.Semaphore(options.concurrency)
+    baseline_rss = rss_bytes(server.pid)
+
+    async def open_client():
+        async with slots:
+            websocket = await connect(url, open_timeout=60, max_queue=None)
+        client = Client(websocket, results)
+        clients.append(client)
+        readers.append(asyncio.create_task(client.read_loop()))
+        await websocket.send(json.dumps({"action": "subscribe", "topic": TOPIC}))
+        await client.subscribed.wait()
+
+    started = time.monotonic()
+    await asyncio.gather(*(open_client() for _ in range(options.connections)))
+    setup = time.monotonic() - started
+    connected_rss = rss_bytes(server.pid)
+
+    results["broadcast"].clear()
+    until = time.monotonic() + options.duration
+    # Spread the pings of all clients evenly over the interval.
+    step = options.ping_interval / len(clients)
+    await asyncio.gather(
+        *(
+            client.ping_loop(index * step, options.ping_interval, until)
+            for index, client in enumerate(clients)
+        ),
+    )
+
+    await asyncio.gather(*(client.websocket.close() for client in clients))
+    for reader in readers:
+        reader.cancel()
+
+    rss_per_1k = (connected_rss - baseline_rss) / options.connections * 1000
+    write = sys.stdout.write
+    write(f"connections:      {options.connections}\n")
+    write(f"setup:            {options.connections / setup:.0f} connections/s\n")
+    write(f"ping round trip:  {percentiles(results['ping'])}")
+    write(f" ({len(results['ping'])} samples)\n")
+    write(f"broadcast:        {percentiles(results['broadcast'])}")
+    write(f" ({len(results['broadcast'])} samples)\n")
+    write(f"server RSS:       {rss_per_1k / 1024 / 1024:.1f} MiB per 1k connections\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=200,
+        help="Handshakes in flight at once.",
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds.")
+    parser.add_argument(
+        "--ping-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between pings on each connection.",
+    )
+    parser.add_argument(
+        "--broadcast-rate",
+        type=float,
+        default=10.0,
+        help="Events published to all connections per second.",
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    raise_open_files_limit()
+    if options.serve:
+        asyncio.run(serve(options))
+        return
+
+    server = start_server(options)
+    try:
+        asyncio.run(run(options, server))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,36 @@ from django.conf import settings
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 from rest_framework.routers import SimpleRouter
+{%- if cookiecutter.use_async == "y" %}
+from rest_framework_simplejwt.views import TokenRefreshView
+{%- else %}
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-
-from {{ cookiecutter.project_slug }}.users.api.views import UserViewSet
+{%- endif %}
+{% if cookiecutter.use_async == "y" %}
+from config.authentication import TokenObtainPairViewSet
+{%- endif %}
+{%- if cookiecutter.cloud_provider == 'AWS' %}
+from config.uploads import UploadViewSet
+{%- endif %}
+from {{ cookiecutter.project_slug }}.users.api.views import {% if cookiecutter.use_async == "y" %}AsyncUserViewSet as UserViewSet{% else %}UserViewSet{% endif %}
 
 router = DefaultRouter() if settings.DEBUG else SimpleRouter()
 
 router.register("users", UserViewSet)
+{%- if cookiecutter.cloud_provider == 'AWS' %}
+router.register("uploads", UploadViewSet, basename="upload")
+{%- endif %}
 
 urlpatterns = [
+    {%- if cookiecutter.use_async == "y" %}
+    path(
+        "token/",
+        TokenObtainPairViewSet.as_view({"post": "create"}),
+        name="token_obtain_pair",
+    ),
+    {%- else %}
     path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    {%- endif %}
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
 ]
 
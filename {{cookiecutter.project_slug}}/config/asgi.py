@@ -14,6 +14,9 @@ from pathlib import Path
 
 from django.core.asgi import get_asgi_application
 
+from config.handlers import APIASGIHandler
+from config.handlers import is_api_path
+
 # This allows easy placement of apps within the interior
 # {{ cookiecutter.project_slug }} directory.
 BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
@@ -24,16 +27,29 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
 
 # This application object is used by any ASGI server configured to use this file.
 django_application = get_asgi_application()
+# API paths skip the session, CSRF and messages middleware.
+api_application = APIASGIHandler()
 
 # Import websocket application here, so apps from django_application are loaded first
+from config.lifespan import lifespan  # noqa: E402
+from config.websocket import at_capacity  # noqa: E402
+from config.websocket import reject  # noqa: E402
 from config.websocket import websocket_application  # noqa: E402
 
 
 async def application(scope, receive, send):
     if scope["type"] == "http":
-        await django_application(scope, receive, send)
+        if is_api_path(scope["path"]):
+            await api_application(scope, receive, send)
+        else:
+            await django_application(scope, receive, send)
     elif scope["type"] == "websocket":
-        await websocket_application(scope, receive, send)
+        if at_capacity():
+            await reject(receive, send)
+        else:
+            await websocket_application(scope, receive, send)
+    elif scope["type"] == "lifespan":
+        await lifespan(scope, receive, send)
     else:
         msg = f"Unknown scope type {scope['type']}"
         raise NotImplementedError(msg)
@@ -0,0 +1,149 @@
+"""
+DRF viewsets served on the event loop.
+
+DRF's dispatch is synchronous, so under ASGI Django hands every DRF request
+to its sync thread as a whole: authentication, permissions, the handler and
+rendering. With ``AsyncViewSetMixin`` first in its bases, a viewset gets a
+coroutine view instead. Negotiation, token authentication, permission checks
+and rendering run on the loop; handlers that are coroutines are awaited, and
+only their database and cache calls (``aget``, ``aiterator``, ``asave``,
+``cache.aget``...) leave it. Sync handlers still work and run in a thread.
+Authenticators with an ``aauthenticate`` method are awaited as well, which
+lets ``LazyUserJWTAuthentication`` read token revocations with ``cache.aget``.
+``apaginate_queryset`` fetches pages with the paginator's own
+``apaginate_queryset`` where it has one, as ``config.pagination``'s
+``CursorPagination`` does, and in a thread otherwise.
+
+Unsafe requests authenticate in a thread too, because
+``LazyUserJWTAuthentication`` loads the user row for them.
+
+Django cannot wrap async views in ``ATOMIC_REQUESTS`` transactions, so these
+views are excluded from it; handlers that write more than one row must use
+``transaction.atomic`` themselves, from sync code.
+"""
+
+from functools import update_wrapper
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db import transaction
+from django.http import Http404
+from django.http import HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.utils.decorators import classonlymethod
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import SAFE_METHODS
+
+
+class AsyncViewSetMixin:
+    """Serve a viewset from an async view; see the module docstring."""
+
+    @classonlymethod
+    def as_view(cls, actions=None, **initkwargs):  # noqa: N805
+        view = super().as_view(actions, **initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return _render(await view(request, *args, **kwargs))
+
+        # Keep cls, actions, initkwargs, csrf_exempt... for routers and schemas.
+        update_wrapper(async_view, view)
+        for alias in connections:
+            async_view = transaction.non_atomic_requests(using=alias)(async_view)
+        return async_view
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            handler = self.http_method_not_allowed
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), handler)
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                # Sync handlers may use the ORM, which must not block the loop.
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:  # noqa: BLE001
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        """Async ``APIView.initial``."""
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        negotiated = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = negotiated
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        if request.method in SAFE_METHODS:
+            await self.aperform_authentication(request)
+        else:
+            await sync_to_async(self.perform_authentication)(request)
+        self.check_permissions(request)
+        self.check_throttles(request)
+
+    async def aperform_authentication(self, request):
+        """Async ``Request._authenticate``, awaiting ``aauthenticate`` methods."""
+        for authenticator in request.authenticators:
+            aauthenticate = getattr(authenticator, "aauthenticate", None)
+            try:
+                if aauthenticate is None:
+                    user_auth_tuple = authenticator.authenticate(request)
+                else:
+                    user_auth_tuple = await aauthenticate(request)
+            except APIException:
+                request._not_authenticated()  # noqa: SLF001
+                raise
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator  # noqa: SLF001
+                request.user, request.auth = user_auth_tuple
+                return
+        request._not_authenticated()  # noqa: SLF001
+
+    async def aget_object(self):
+        """Async ``GenericAPIView.get_object``."""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            obj = await queryset.aget(**filter_kwargs)
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404 from None
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        """Async ``GenericAPIView.paginate_queryset``."""
+        paginator = self.paginator
+        if paginator is None:
+            return None
+        if hasattr(paginator, "apaginate_queryset"):
+            return await paginator.apaginate_queryset(queryset, self.request, view=self)
+        return await sync_to_async(paginator.paginate_queryset)(
+            queryset,
+            self.request,
+            view=self,
+        )
+
+
+def _render(response):
+    """Render a DRF response here rather than in the thread Django would use."""
+    if not isinstance(response, SimpleTemplateResponse):
+        return response
+    response.render()
+    rendered = HttpResponse(
+        response.content,
+        status=response.status_code,
+        headers=response.headers,
+    )
+    rendered.cookies = response.cookies
+    return rendered
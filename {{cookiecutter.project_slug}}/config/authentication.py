@@ -0,0 +1,258 @@
+"""
+JWT authentication without a database round-trip per request.
+
+``LazyUserJWTAuthentication`` trusts the signed access token on safe-method
+requests and hands the view a ``LazyTokenUser`` built from its claims. The
+``User`` row is only fetched if the view touches an attribute the token does
+not carry. Unsafe requests still load (and check) the user up front.
+Deactivating or deleting a user revokes the access tokens issued to them
+so far with a cache entry (``revoke_user_tokens``), which safe requests
+check instead of ``User.is_active``.
+
+Refresh tokens are blacklisted in the default cache (Redis in production)
+under a key that expires together with the token, so rotating a refresh
+token never writes to PostgreSQL.
+{%- if cookiecutter.use_async == 'y' %}
+
+``TokenObtainPairViewSet`` issues tokens from the event loop; the password
+is checked on the password hashing threads (see ``config.hashers``).
+{%- endif %}
+"""
+
+{% if cookiecutter.use_async == 'y' -%}
+from asgiref.sync import sync_to_async
+{% endif -%}
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+{%- if cookiecutter.use_async == 'y' %}
+from rest_framework.response import Response
+from rest_framework.viewsets import GenericViewSet
+{%- endif %}
+from rest_framework_simplejwt.authentication import JWTAuthentication
+{%- if cookiecutter.use_async == 'y' %}
+from rest_framework_simplejwt.exceptions import InvalidToken
+{%- endif %}
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer as BaseTokenObtainPairSerializer,
+)
+from rest_framework_simplejwt.serializers import (
+    TokenRefreshSerializer as BaseTokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from rest_framework_simplejwt.utils import datetime_to_epoch
+{% if cookiecutter.use_async == 'y' %}
+from config.async_views import AsyncViewSetMixin
+from config.hashers import acheck_password
+from config.hashers import amake_password
+{%- endif %}
+from {{ cookiecutter.project_slug }}.users.last_login import record_last_login
+
+BLACKLIST_KEY_PREFIX = "jwt:blacklist:"
+REVOKED_USER_KEY_PREFIX = "jwt:revoked-user:"
+# User attributes copied into the token so read paths can skip the User row.
+USER_CLAIMS = ("is_staff", "is_superuser")
+
+
+def revoked_user_key(pk) -> str:
+    return f"{REVOKED_USER_KEY_PREFIX}{pk}"
+
+
+def revoke_user_tokens(pk) -> None:
+    """Reject the access tokens issued to user ``pk`` until now."""
+    timeout = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    cache.set(revoked_user_key(pk), datetime_to_epoch(aware_utcnow()), timeout)
+
+
+class LazyTokenUser(TokenUser):
+    """A ``TokenUser`` that loads the ``User`` row for attributes not in the token."""
+
+    @cached_property
+    def instance(self):
+        return get_user_model()._default_manager.get(pk=self.pk)  # noqa: SLF001
+
+    async def ainstance(self):
+        """Async ``instance``, for views running on the event loop."""
+        if "instance" not in self.__dict__:
+            manager = get_user_model()._default_manager  # noqa: SLF001
+            self.__dict__["instance"] = await manager.aget(pk=self.pk)
+        return self.instance
+
+    @property
+    def is_active(self):
+        # TokenUser.is_active is always True.
+        if "instance" in self.__dict__:
+            return self.instance.is_active
+        return not self.revoked
+
+    @cached_property
+    def revoked(self) -> bool:
+        """Whether the user was deactivated or deleted after the token was issued."""
+        return self.issued_before(cache.get(revoked_user_key(self.pk)))
+
+    async def arevoked(self) -> bool:
+        """Async ``revoked``."""
+        if "revoked" not in self.__dict__:
+            revoked_at = await cache.aget(revoked_user_key(self.pk))
+            self.__dict__["revoked"] = self.issued_before(revoked_at)
+        return self.revoked
+
+    def issued_before(self, timestamp) -> bool:
+        return timestamp is not None and self.token.get("iat", 0) <= timestamp
+
+    @cached_property
+    def username(self):
+        # TokenUser.username is "" when the token has no such claim, which
+        # would hide the real one from serializers and URL reversing.
+        if "username" in self.token:
+            return self.token["username"]
+        return getattr(self.instance, "username", "")
+
+    def __getattr__(self, attr):
+        if attr.startswith("_") or attr == "token":
+            raise AttributeError(attr)
+        if attr in self.token:
+            return self.token[attr]
+        return getattr(self.instance, attr)
+
+
+class LazyUserJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        validated_token = self.get_request_token(request)
+        if validated_token is None:
+            return None
+        if request.method in SAFE_METHODS:
+            user = LazyTokenUser(validated_token)
+            self.check_active(user)
+            return user, validated_token
+        return self.get_user(validated_token), validated_token
+
+    async def aauthenticate(self, request):
+        """``authenticate`` for safe requests, from the event loop."""
+        validated_token = self.get_request_token(request)
+        if validated_token is None:
+            return None
+        user = LazyTokenUser(validated_token)
+        await user.arevoked()
+        self.check_active(user)
+        return user, validated_token
+
+    def get_request_token(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        return self.get_validated_token(raw_token)
+
+    def check_active(self, user):
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+
+class RefreshToken(BaseRefreshToken):
+    """Refresh token whose blacklist lives in the cache rather than the database."""
+
+    def verify(self, *args, **kwargs):
+        self.check_blacklist()
+        super().verify(*args, **kwargs)
+
+    def blacklist_key(self) -> str:
+        return f"{BLACKLIST_KEY_PREFIX}{self[api_settings.JTI_CLAIM]}"
+
+    def check_blacklist(self):
+        if cache.get(self.blacklist_key()):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        expires_at = datetime_from_epoch(self["exp"])
+        ttl = int((expires_at - aware_utcnow()).total_seconds())
+        if ttl > 0:
+            cache.set(self.blacklist_key(), 1, timeout=ttl)
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class TokenObtainPairSerializer(BaseTokenObtainPairSerializer):
+    """Issue cache-blacklistable tokens and buffer the ``last_login`` update."""
+
+    token_class = RefreshToken
+{%- if cookiecutter.use_async == 'y' %}
+    # Set by aauthenticate(); validate() then reuses its user.
+    authenticated = False
+
+    async def aauthenticate(self):
+        """Check the credentials in ``initial_data`` without blocking the loop."""
+        attrs = self.to_internal_value(self.initial_data)
+        manager = get_user_model()._default_manager  # noqa: SLF001
+        self.user = None
+        try:
+            user = await manager.aget_by_natural_key(attrs[self.username_field])
+        except manager.model.DoesNotExist:
+            # Hash anyway, like ModelBackend, so unknown usernames take as long.
+            await amake_password(attrs["password"])
+        else:
+            if await acheck_password(user, attrs["password"]):
+                self.user = user
+        self.authenticated = True
+
+    def validate(self, attrs):
+        if not self.authenticated:
+            data = super().validate(attrs)
+        elif not api_settings.USER_AUTHENTICATION_RULE(self.user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"],
+                "no_active_account",
+            )
+        else:
+            refresh = self.get_token(self.user)
+            data = {"refresh": str(refresh), "access": str(refresh.access_token)}
+        record_last_login(self.user)
+        return data
+{%- else %}
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        record_last_login(self.user)
+        return data
+{%- endif %}
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    token_class = RefreshToken
+{%- if cookiecutter.use_async == 'y' %}
+
+
+class TokenObtainPairViewSet(AsyncViewSetMixin, GenericViewSet):
+    """``TokenObtainPairView`` served on the event loop."""
+
+    authentication_classes = ()
+    permission_classes = ()
+    serializer_class = TokenObtainPairSerializer
+
+    async def create(self, request):
+        serializer = self.get_serializer(data=request.data)
+        await serializer.aauthenticate()
+        try:
+            # Signing is quick, but the last_login buffer may fall back to SQL.
+            await sync_to_async(serializer.is_valid)(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0]) from e
+        return Response(serializer.validated_data)
+{%- endif %}
@@ -0,0 +1,113 @@
+"""
+Celery tasks that process their items in batches.
+
+Fanning out per-object work (one message per user to notify or recompute)
+floods the broker and the result backend. A task created with
+``batched_task`` takes a list of items instead, and is fed in two ways::
+
+    @batched_task(max_size=500, max_wait=2.0)
+    def recompute_scores(user_ids):
+        ...
+        return [score for ...]  # One result per item.
+
+    recompute_scores.add(user.pk)  # Buffered, e.g. from a signal handler.
+    recompute_scores.delay_many(user_ids)  # A known list, max_size per message.
+
+``add`` pushes items to a Redis list. The first item of an empty buffer
+schedules a run ``max_wait`` seconds later, and every ``max_size`` items
+schedule one right away; each run pops up to ``max_size`` items. Items popped
+by a worker that dies before finishing are lost, so use ``delay_many`` when
+every item must be processed.
+
+The function returns one result per item, in order; an exception instance in
+its place marks that item as failed without failing the others. The task
+returns a report with, per item, either its ``result`` or its ``error``;
+pass ``ignore_result=False`` to store it.
+"""
+
+import json
+import logging
+from functools import cache
+
+import redis
+from celery import Task
+from celery import shared_task
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+@cache
+def get_redis() -> redis.Redis:
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+class BatchTask(Task):
+    """Base class of the tasks created by ``batched_task``."""
+
+    max_size = 100
+    max_wait = 1.0
+
+    @property
+    def buffer_key(self) -> str:
+        return f"batch:{self.name}"
+
+    def add(self, *items) -> None:
+        """Buffer ``items`` to be processed within ``max_wait`` seconds."""
+        if not items:
+            return
+        length = get_redis().rpush(self.buffer_key, *map(json.dumps, items))
+        previous = length - len(items)
+        if previous == 0:
+            self.apply_async(countdown=self.max_wait)
+        for _ in range(length // self.max_size - previous // self.max_size):
+            self.apply_async()
+
+    def delay_many(self, items) -> list:
+        """Send ``items`` to the broker directly, ``max_size`` per message."""
+        items = list(items)
+        return [
+            self.delay(items[start : start + self.max_size])
+            for start in range(0, len(items), self.max_size)
+        ]
+
+    def pop(self) -> list:
+        """Take the next batch from the buffer."""
+        with get_redis().pipeline() as pipe:
+            pipe.lpop(self.buffer_key, self.max_size)
+            pipe.llen(self.buffer_key)
+            values, remaining = pipe.execute()
+        if remaining:
+            # Make sure what is left is picked up even if no more items come.
+            self.apply_async(countdown=self.max_wait)
+        return [json.loads(value) for value in values or []]
+
+    def __call__(self, items=None):
+        if items is None:
+            items = self.pop()
+            if not items:
+                return []  # Another run already took them.
+        results = super().__call__(items)
+        if results is None:
+            results = [None] * len(items)
+        report = []
+        for item, result in zip(items, results, strict=True):
+            if isinstance(result, Exception):
+                report.append({"item": item, "error": repr(result)})
+            else:
+                report.append({"item": item, "result": result})
+        failed = sum("error" in entry for entry in report)
+        if failed:
+            logger.warning("%s: %d of %d items failed", self.name, failed, len(items))
+        return report
+
+
+def batched_task(*, max_size=100, max_wait=1.0, **options):
+    """
+    Turn ``fun(items) -> results`` into a ``BatchTask``.
+
+    Other options are passed to ``shared_task``; batches go to the "bulk"
+    queue unless ``queue`` says otherwise.
+    """
+    options.setdefault("queue", "bulk")
+    return shared_task(base=BatchTask, max_size=max_size, max_wait=max_wait, **options)
@@ -2,6 +2,11 @@ import os
 
 from celery import Celery
 from celery.signals import setup_logging
+from celery.signals import task_prerun
+from django.core.exceptions import ImproperlyConfigured
+from kombu import Queue
+
+from config.enqueue import release_pending_key
 
 # set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
@@ -14,6 +19,48 @@ app = Celery("{{cookiecutter.project_slug}}")
 #   should have a `CELERY_` prefix.
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
+# Worker settings per queue, in the order a worker consuming several queues
+# polls them. Tasks are routed by CELERY_TASK_ROUTES. Short tasks are prefetched
+# a few at a time; long ones one at a time and only acknowledged once done, so
+# a lost worker's task is redelivered instead of dropped.
+QUEUE_PROFILES = {
+    "fast": {
+        "worker_concurrency": 8,
+        "worker_prefetch_multiplier": 4,
+        "task_acks_late": False,
+    },
+    "default": {
+        "worker_concurrency": 4,
+        "worker_prefetch_multiplier": 2,
+        "task_acks_late": False,
+    },
+    "bulk": {
+        "worker_concurrency": 2,
+        "worker_prefetch_multiplier": 1,
+        "task_acks_late": True,
+    },
+}
+app.conf.task_queues = [Queue(name) for name in QUEUE_PROFILES]
+
+
+def worker_profile(queue: str) -> dict:
+    """Return the worker settings for ``queue``, as named by CELERY_WORKER_QUEUE."""
+    try:
+        return QUEUE_PROFILES[queue]
+    except KeyError:
+        queues = ", ".join(QUEUE_PROFILES)
+        msg = f"CELERY_WORKER_QUEUE={queue!r} is not a queue; use one of {queues}."
+        raise ImproperlyConfigured(msg) from None
+
+
+# Workers dedicated to one queue (see compose/production/django/celery/worker/start)
+# take its profile. It must be applied before tasks are bound to the app, which
+# copies task_acks_late onto each of them.
+if queue := os.environ.get("CELERY_WORKER_QUEUE"):
+    app.conf.update(worker_profile(queue))
+if concurrency := os.environ.get("CELERY_WORKER_CONCURRENCY"):
+    app.conf.worker_concurrency = int(concurrency)
+
 
 @setup_logging.connect
 def config_loggers(*args, **kwargs):
@@ -24,5 +71,9 @@ def config_loggers(*args, **kwargs):
     dictConfig(settings.LOGGING)
 
 
+# Tasks sent with config.enqueue.enqueue(..., coalesce=True) free their key on start.
+task_prerun.connect(release_pending_key)
+
+
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
@@ -0,0 +1,125 @@
+"""
+Database helpers shared by views.
+
+When ``DATABASE_POOL`` is enabled, Django keeps a psycopg ``ConnectionPool``
+per database alias. The helpers below expose its statistics to the health
+check endpoint{% if cookiecutter.monitoring == "Prometheus" or cookiecutter.monitoring == "Grafana" %} and to Prometheus{% endif %}.
+
+``ATOMIC_REQUESTS`` wraps every request in a transaction on the primary.
+Read-only views can opt out with ``NonAtomicReadsMixin`` or
+``non_atomic_reads`` so safe-method requests neither hold a transaction open
+nor pin a primary connection, while their writes stay atomic.
+"""
+
+from functools import wraps
+
+from django.db import DatabaseError
+from django.db import connections
+from django.db import transaction
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+{%- if cookiecutter.monitoring == "Prometheus" or cookiecutter.monitoring == "Grafana" %}
+from prometheus_client import REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+{%- endif %}
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def non_atomic_reads(view_func):
+    """Exclude safe-method requests to a function view from ``ATOMIC_REQUESTS``."""
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return view_func(request, *args, **kwargs)
+        with transaction.atomic():
+            return view_func(request, *args, **kwargs)
+
+    return transaction.non_atomic_requests(wrapper)
+
+
+class NonAtomicReadsMixin:
+    """Class-based view counterpart of :func:`non_atomic_reads`.
+
+    Must come before the view base class. For DRF views, a handled API
+    exception still rolls the write transaction back through
+    ``rest_framework.views.set_rollback``.
+    """
+
+    @classmethod
+    def as_view(cls, *args, **initkwargs):
+        return transaction.non_atomic_requests(super().as_view(*args, **initkwargs))
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with transaction.atomic():
+            return super().dispatch(request, *args, **kwargs)
+
+
+def pool_stats() -> dict[str, dict[str, int]]:
+    """Return psycopg pool statistics keyed by database alias.
+
+    Aliases without a pool (``DATABASE_POOL`` disabled, or a backend other
+    than PostgreSQL) are left out.
+    """
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            stats[alias] = pool.get_stats()
+    return stats
+
+
+@never_cache
+@require_GET
+@transaction.non_atomic_requests
+def health_check(request):
+    """Report whether every configured database answers a trivial query."""
+    status = 200
+    databases = {}
+    for alias in connections:
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except DatabaseError:
+            status = 503
+            databases[alias] = "unavailable"
+        else:
+            databases[alias] = "ok"
+    return JsonResponse(
+        {"databases": databases, "pools": pool_stats()},
+        status=status,
+    )
+{%- if cookiecutter.monitoring == "Prometheus" or cookiecutter.monitoring == "Grafana" %}
+
+
+class DatabasePoolCollector:
+    """Expose psycopg pool statistics as Prometheus gauges."""
+
+    # psycopg_pool stats key -> (metric suffix, documentation)
+    GAUGES = {
+        "pool_min": ("min_size", "Configured minimum number of pooled connections."),
+        "pool_max": ("max_size", "Configured maximum number of pooled connections."),
+        "pool_size": ("size", "Connections currently managed by the pool."),
+        "pool_available": ("available", "Idle connections ready to be handed out."),
+        "requests_waiting": ("requests_waiting", "Clients waiting for a connection."),
+    }
+
+    def collect(self):
+        stats = pool_stats()
+        for key, (suffix, documentation) in self.GAUGES.items():
+            gauge = GaugeMetricFamily(
+                f"django_db_pool_{suffix}",
+                documentation,
+                labels=["alias"],
+            )
+            for alias, values in stats.items():
+                gauge.add_metric([alias], values.get(key, 0))
+            yield gauge
+
+
+REGISTRY.register(DatabasePoolCollector())
+{%- endif %}
@@ -0,0 +1,154 @@
+"""
+Primary/replica database routing.
+
+Enabled by setting ``DATABASE_REPLICA_URL``. Reads are sent to the ``replica``
+alias only while a request with a safe HTTP method is being handled, so
+management commands, Celery tasks and write requests always see the primary.
+A client that has just written keeps reading from the primary for
+``DATABASE_REPLICA_STICKY_SECONDS`` so it never observes stale data, and the
+replica is skipped altogether while it lags more than
+``DATABASE_REPLICA_MAX_LAG`` seconds behind.
+"""
+
+import math
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+from django.db import DatabaseError
+from django.db import connections
+
+REPLICA_DB_ALIAS = "replica"
+STICKY_COOKIE_NAME = "primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# How often (seconds) each process re-measures the replica lag.
+LAG_CHECK_INTERVAL = 1.0
+# A replica that has replayed everything it received is not lagging, even if
+# the last replayed transaction is old because the primary has been idle.
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+@dataclass
+class RoutingState:
+    use_replica: bool
+    wrote: bool = False
+
+
+_routing_state: ContextVar[RoutingState | None] = ContextVar(
+    "routing_state",
+    default=None,
+)
+_lag_sample: tuple[float, float] = (-math.inf, math.inf)
+
+
+def replica_lag() -> float:
+    """Return the replica lag in seconds, sampled at most once per interval.
+
+    An unreachable replica reports an infinite lag.
+    """
+    global _lag_sample  # noqa: PLW0603
+    sampled_at, lag = _lag_sample
+    now = time.monotonic()
+    if now - sampled_at < LAG_CHECK_INTERVAL:
+        return lag
+    try:
+        with connections[REPLICA_DB_ALIAS].cursor() as cursor:
+            cursor.execute(REPLICA_LAG_SQL)
+            lag = float(cursor.fetchone()[0])
+    except DatabaseError:
+        lag = math.inf
+    _lag_sample = (now, lag)
+    return lag
+
+
+class PrimaryReplicaRouter:
+    """Send reads to the replica when it is safe to do so, writes to the primary."""
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or not state.use_replica:
+            return DEFAULT_DB_ALIAS
+        if replica_lag() > settings.DATABASE_REPLICA_MAX_LAG:
+            state.use_replica = False
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            # Read-your-writes for the rest of this request and the next few.
+            state.use_replica = False
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """Scope replica reads to the current request; keep writers on the primary."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if REPLICA_DB_ALIAS not in settings.DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = self.start(request)
+        token = _routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        return self.finish(request, response, state)
+
+    async def __acall__(self, request):
+        state = self.start(request)
+        token = _routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        return self.finish(request, response, state)
+
+    def start(self, request) -> RoutingState:
+        try:
+            primary_until = float(request.COOKIES.get(STICKY_COOKIE_NAME, 0))
+        except ValueError:
+            primary_until = 0
+        use_replica = request.method in SAFE_METHODS and primary_until < time.time()
+        return RoutingState(use_replica=use_replica)
+
+    def finish(self, request, response, state: RoutingState):
+        if state.wrote or request.method not in SAFE_METHODS:
+            sticky_seconds = settings.DATABASE_REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                STICKY_COOKIE_NAME,
+                str(int(time.time()) + sticky_seconds),
+                max_age=sticky_seconds,
+                secure=request.is_secure(),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
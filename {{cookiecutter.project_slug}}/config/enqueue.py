@@ -0,0 +1,118 @@
+"""
+Deduplicated and rate-limited task enqueueing.
+
+``enqueue`` sends a task like ``apply_async`` does, with three extra guards
+backed by Redis, so a hot key (say, recomputing a user on every save) does
+not multiply queue depth and worker time::
+
+    enqueue(recompute_user, args=[user.pk], key=user.pk, coalesce=True)
+    enqueue(sync_to_crm, args=[user.pk], key=user.pk, ttl=60)
+    enqueue(call_partner_api, args=[order.pk], rate="10/s")
+
+- ``key`` makes the call idempotent: only the first call with the same task
+  and key within ``ttl`` seconds sends the task; the others return ``None``.
+- ``coalesce=True`` instead keeps at most one task per key pending: the key
+  is released as soon as the task starts, so changes made while it runs
+  enqueue it again. ``ttl`` then only bounds how long a lost message can
+  block the key.
+- ``rate`` ("10/s", "100/m", "1000/h") is a token bucket shared by every
+  process enqueueing the task, holding up to ``burst`` tokens. Calls beyond
+  it are not dropped but delayed with a ``countdown`` until their token is
+  due.
+"""
+
+import math
+from functools import cache
+
+import redis
+from celery.utils.time import rate as parse_rate
+from django.conf import settings
+
+PENDING_HEADER = "pending_key"
+DEFAULT_TTL = 60 * 60
+
+# Takes a token from the bucket at KEYS[1], refilled at ARGV[1] tokens per
+# second up to ARGV[2], and returns the seconds until that token is due. The
+# bucket may go into debt, which is what spaces out the delayed calls.
+BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "at")
+local tokens = tonumber(bucket[1]) or capacity
+local at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - at) * rate) - 1
+redis.call("HSET", KEYS[1], "tokens", tokens, "at", now)
+redis.call("EXPIRE", KEYS[1], math.ceil((capacity - tokens) / rate) + 1)
+if tokens >= 0 then
+    return "0"
+end
+return tostring(-tokens / rate)
+"""
+
+
+@cache
+def get_redis() -> redis.Redis:
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+@cache
+def _bucket_script():
+    return get_redis().register_script(BUCKET_SCRIPT)
+
+
+def take_token(name: str, rate: str, burst: int | None = None) -> float:
+    """Take a token from the bucket ``name``; return the seconds until it is due."""
+    per_second = parse_rate(rate)
+    capacity = burst if burst is not None else max(1, math.ceil(per_second))
+    delay = _bucket_script()(keys=[f"ratelimit:{name}"], args=[per_second, capacity])
+    return float(delay)
+
+
+def enqueue(  # noqa: PLR0913
+    task,
+    args=(),
+    kwargs=None,
+    *,
+    key=None,
+    coalesce=False,
+    ttl=DEFAULT_TTL,
+    rate=None,
+    burst=None,
+    **options,
+):
+    """
+    Send ``task`` unless an equal one is already pending; see the module docstring.
+
+    Returns the ``AsyncResult``, or ``None`` when the call was deduplicated.
+    """
+    pending_key = None
+    if key is not None:
+        pending_key = f"enqueue:{task.name}:{key}"
+        if not get_redis().set(pending_key, 1, nx=True, ex=ttl):
+            return None
+        if coalesce:
+            headers = options.get("headers", {})
+            options["headers"] = {**headers, PENDING_HEADER: pending_key}
+    if rate is not None:
+        delay = take_token(task.name, rate, burst)
+        if delay:
+            options["countdown"] = max(options.get("countdown", 0), delay)
+    try:
+        return task.apply_async(args, kwargs, **options)
+    except Exception:
+        if pending_key is not None:
+            get_redis().delete(pending_key)
+        raise
+
+
+def release_pending_key(task=None, **kwargs) -> None:
+    """Release the key of a coalesced task as it starts; a ``task_prerun`` handler."""
+    # Workers copy message headers onto the request; eager calls
+    # (CELERY_TASK_ALWAYS_EAGER in tests) only keep them in request.headers.
+    pending_key = task.request.get(PENDING_HEADER) or (
+        task.request.headers or {}
+    ).get(PENDING_HEADER)
+    if pending_key:
+        get_redis().delete(pending_key)
@@ -0,0 +1,124 @@
+"""
+Request handlers with a trimmed middleware stack for API routes.
+
+JWT-authenticated API calls (the paths matching ``CORS_URLS_REGEX``) have no
+use for sessions, CSRF, messages or clickjacking protection, yet
+``MIDDLEWARE`` runs all of them on every request. Instead, those paths are
+routed to a second handler built from ``API_MIDDLEWARE`` (see
+``config.wsgi``{% if cookiecutter.use_async == 'y' %} and ``config.asgi``{% endif %}), so API requests skip
+that middleware entirely.
+
+DRF authenticates API requests itself and sets ``request.user``; code run
+before the view must not rely on it being there.
+"""
+
+import logging
+import re
+from functools import cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import MiddlewareNotUsed
+{%- if cookiecutter.use_async == 'y' %}
+from django.core.handlers.asgi import ASGIHandler
+{%- endif %}
+from django.core.handlers.exception import convert_exception_to_response
+from django.core.handlers.wsgi import WSGIHandler
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger("django.request")
+
+
+@cache
+def _api_path():
+    return re.compile(settings.CORS_URLS_REGEX)
+
+
+def is_api_path(path: str) -> bool:
+    return _api_path().match(path) is not None
+
+
+class APIMiddlewareMixin:
+    """Build the handler's middleware chain from ``API_MIDDLEWARE``."""
+
+    def load_middleware(self, is_async=False):  # noqa: FBT002
+        """``BaseHandler.load_middleware``, reading ``API_MIDDLEWARE``.
+
+        Django's version only reads ``settings.MIDDLEWARE``, and swapping that
+        global out while it runs would race with other handlers being built.
+        """
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        get_response = self._get_response_async if is_async else self._get_response
+        handler = convert_exception_to_response(get_response)
+        handler_is_async = is_async
+        for middleware_path in reversed(settings.API_MIDDLEWARE):
+            middleware = import_string(middleware_path)
+            middleware_can_sync = getattr(middleware, "sync_capable", True)
+            middleware_can_async = getattr(middleware, "async_capable", False)
+            if not middleware_can_sync and not middleware_can_async:
+                msg = (
+                    f"Middleware {middleware_path} must have at least one of "
+                    "sync_capable/async_capable set to True."
+                )
+                raise RuntimeError(msg)
+            if not handler_is_async and middleware_can_sync:
+                middleware_is_async = False
+            else:
+                middleware_is_async = middleware_can_async
+            try:
+                adapted_handler = self.adapt_method_mode(
+                    middleware_is_async,
+                    handler,
+                    handler_is_async,
+                    debug=settings.DEBUG,
+                    name=f"middleware {middleware_path}",
+                )
+                mw_instance = middleware(adapted_handler)
+            except MiddlewareNotUsed:
+                logger.debug("MiddlewareNotUsed: %r", middleware_path)
+                continue
+            handler = adapted_handler
+
+            if mw_instance is None:
+                msg = f"Middleware factory {middleware_path} returned None."
+                raise ImproperlyConfigured(msg)
+            if hasattr(mw_instance, "process_view"):
+                self._view_middleware.insert(
+                    0,
+                    self.adapt_method_mode(is_async, mw_instance.process_view),
+                )
+            if hasattr(mw_instance, "process_template_response"):
+                self._template_response_middleware.append(
+                    self.adapt_method_mode(
+                        is_async,
+                        mw_instance.process_template_response,
+                    ),
+                )
+            if hasattr(mw_instance, "process_exception"):
+                # Django runs exception middleware synchronously.
+                self._exception_middleware.append(
+                    self.adapt_method_mode(
+                        is_async=False,
+                        method=mw_instance.process_exception,
+                    ),
+                )
+
+            handler = convert_exception_to_response(mw_instance)
+            handler_is_async = middleware_is_async
+
+        handler = self.adapt_method_mode(is_async, handler, handler_is_async)
+        # Set last: Django treats it as the "initialization done" flag.
+        self._middleware_chain = handler
+
+
+class APIWSGIHandler(APIMiddlewareMixin, WSGIHandler):
+    pass
+{%- if cookiecutter.use_async == 'y' %}
+
+
+class APIASGIHandler(APIMiddlewareMixin, ASGIHandler):
+    pass
+{%- endif %}
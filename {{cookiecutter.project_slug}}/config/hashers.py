@@ -0,0 +1,63 @@
+"""
+Password hashing tuned for login throughput.
+
+``Argon2PasswordHasher`` takes its cost profile from settings, so it can be
+sized to the hardware; hashes made with another profile are upgraded on the
+user's next successful login. At most ``PASSWORD_HASHING_WORKERS`` hashes are
+computed at once per process, which caps the CPU spent on authentication.
+
+Async views check passwords with ``acheck_password`` and ``amake_password``,
+which hash on a pool of ``PASSWORD_HASHING_WORKERS`` threads of their own:
+never on the event loop nor on the sync thread ``sync_to_async`` calls
+share by default, and in parallel since argon2 releases the GIL.
+``django.contrib.auth.aauthenticate`` is not used for this, as it hashes on
+the event loop for unknown usernames.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import hashers
+
+_slots = threading.BoundedSemaphore(settings.PASSWORD_HASHING_WORKERS)
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    thread_name_prefix="password-hashing",
+)
+
+
+def _in_pool(func):
+    return sync_to_async(func, thread_sensitive=False, executor=_executor)
+
+
+async def amake_password(password) -> str:
+    """``make_password`` on the hashing threads."""
+    return await _in_pool(hashers.make_password)(password)
+
+
+async def acheck_password(user, password) -> bool:
+    """``user.check_password`` on the hashing threads, upgrading stale hashes."""
+    is_correct, must_update = await _in_pool(hashers.verify_password)(
+        password,
+        user.password,
+    )
+    if is_correct and must_update:
+        user.password = await amake_password(password)
+        await user.asave(update_fields=["password"])
+    return is_correct
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    time_cost = settings.ARGON2_TIME_COST
+    memory_cost = settings.ARGON2_MEMORY_COST
+    parallelism = settings.ARGON2_PARALLELISM
+
+    def encode(self, password, salt):
+        with _slots:
+            return super().encode(password, salt)
+
+    def verify(self, password, encoded):
+        with _slots:
+            return super().verify(password, encoded)
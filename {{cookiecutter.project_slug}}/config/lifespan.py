@@ -0,0 +1,129 @@
+"""
+ASGI lifespan handling.
+
+On startup, before the server reports ready, the work that would otherwise
+slow down the first requests of every new process is done up front: the
+database pools are filled, the URL resolver and API schema are built, and
+cache connections are opened. A failing step is logged and skipped; the
+readiness of backing services is reported by ``/health/``.
+
+On shutdown, websockets still open are closed with "going away" once their
+queued frames are sent, then the Redis and database pools are closed.
+Uvicorn closes open sockets itself before the lifespan shutdown, in which
+case only the cleanup remains.
+"""
+
+import asyncio
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.db import connections
+from django.urls import get_resolver
+from drf_spectacular.generators import SchemaGenerator
+
+from config import websocket
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for websockets to close on shutdown.
+SHUTDOWN_TIMEOUT = 10.0
+
+
+def open_database_pools():
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            pool.open(wait=True, timeout=pool.timeout)
+
+
+def load_content_types():
+    # Used by permission checks and the admin, cached per process.
+    ContentType.objects.get_for_models(*apps.get_models())
+    connections.close_all()
+
+
+def build_url_resolver():
+    get_resolver().reverse_dict  # noqa: B018
+
+
+def build_api_schema():
+    SchemaGenerator().get_schema(request=None, public=True)
+
+
+def connect_caches():
+    for alias in settings.CACHES:
+        caches[alias].get("lifespan:warm-up")
+
+
+WARM_UP_STEPS = [
+    open_database_pools,
+    load_content_types,
+    build_url_resolver,
+    build_api_schema,
+    connect_caches,
+]
+
+
+def close_database_pools():
+    for alias in connections:
+        connection = connections[alias]
+        if getattr(connection, "pool", None) is not None:
+            connection.close_pool()
+
+
+async def startup():
+    started = time.monotonic()
+    for step in WARM_UP_STEPS:
+        step_started = time.monotonic()
+        try:
+            await sync_to_async(step)()
+        except Exception:
+            logger.exception("Warm-up step %s failed", step.__name__)
+        else:
+            logger.debug(
+                "Warm-up step %s took %.3fs",
+                step.__name__,
+                time.monotonic() - step_started,
+            )
+    logger.info("Warm-up finished in %.3fs", time.monotonic() - started)
+
+
+async def shutdown():
+    waiting = []
+    for connection in list(websocket.connections):
+        connection.close(websocket.CLOSE_GOING_AWAY, flush=True)
+        waiting.append(asyncio.create_task(connection.closed.wait()))
+    if waiting:
+        _, pending = await asyncio.wait(waiting, timeout=SHUTDOWN_TIMEOUT)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(
+                "%d websockets still open after %ss",
+                len(pending),
+                SHUTDOWN_TIMEOUT,
+            )
+    await websocket.hub.close()
+    await sync_to_async(close_database_pools)()
+
+
+async def lifespan(scope, receive, send):
+    while True:
+        event = await receive()
+        if event["type"] == "lifespan.startup":
+            await startup()
+            await send({"type": "lifespan.startup.complete"})
+        elif event["type"] == "lifespan.shutdown":
+            try:
+                await shutdown()
+            except Exception as exc:
+                logger.exception("Shutdown failed")
+                await send({"type": "lifespan.shutdown.failed", "message": str(exc)})
+            else:
+                await send({"type": "lifespan.shutdown.complete"})
+            return
@@ -0,0 +1,192 @@
+"""
+Full-page cache for anonymous visitors.
+
+``PageCacheMiddleware`` sits right after ``SecurityMiddleware``. For the
+paths in ``PAGE_CACHE_PATHS`` it answers anonymous GET and HEAD requests
+(no session cookie, no ``Authorization`` header) from the cache before the
+session, CSRF, locale and messages middleware run, so a hit touches neither
+the database nor the session store. Entries are keyed by path, language
+and ``PAGE_CACHE_VERSION``; the query string is ignored.
+
+An entry is fresh for ``PAGE_CACHE_TIMEOUT`` seconds, then served stale for
+up to ``PAGE_CACHE_STALE_TIMEOUT`` more while a single request renders it
+again. When there is no entry at all, one request renders the page and the
+others wait for it (up to ``PAGE_CACHE_LOCK_TIMEOUT`` seconds) instead of
+all rendering it at once.
+
+Only 200 responses that set no cookie and are not marked private or
+no-store are cached. ``purge`` (or ``POST /api/page-cache/purge/``) drops
+entries after the content of a page changed.
+"""
+
+import asyncio
+import time
+
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.utils import translation
+from rest_framework import serializers
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+CACHED_METHODS = ("GET", "HEAD")
+# Seconds between checks for an entry another request is rendering.
+WAIT_INTERVAL = 0.05
+
+
+def page_cache():
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def cache_key(path: str, language: str) -> str:
+    return f"page:{settings.PAGE_CACHE_VERSION}:{language}:{path}"
+
+
+def purge(paths=None) -> None:
+    """Drop the cached versions of ``paths`` (default: every cached path)."""
+    paths = settings.PAGE_CACHE_PATHS if paths is None else paths
+    languages = [code for code, _ in settings.LANGUAGES]
+    page_cache().delete_many(
+        [cache_key(path, language) for path in paths for language in languages],
+    )
+
+
+def is_cacheable(response) -> bool:
+    cache_control = response.get("Cache-Control", "").lower()
+    return (
+        response.status_code == 200  # noqa: PLR2004
+        and not response.streaming
+        and not response.cookies
+        and "private" not in cache_control
+        and "no-store" not in cache_control
+    )
+
+
+def to_entry(response) -> dict:
+    return {
+        "fresh_until": time.time() + settings.PAGE_CACHE_TIMEOUT,
+        "status": response.status_code,
+        "headers": dict(response.items()),
+        "content": response.content,
+    }
+
+
+def from_entry(entry: dict, state: str) -> HttpResponse:
+    response = HttpResponse(
+        entry["content"],
+        status=entry["status"],
+        headers=entry["headers"],
+    )
+    response["X-Page-Cache"] = state
+    return response
+
+
+class PageCacheMiddleware:
+    """Serve anonymous requests for cached pages; see the module docstring."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PAGE_CACHE_PATHS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.paths = frozenset(settings.PAGE_CACHE_PATHS)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def cache_key(self, request) -> str | None:
+        """Return the key of the page ``request`` asks for, if it may be cached."""
+        if (
+            request.method not in CACHED_METHODS
+            or request.path_info not in self.paths
+            or settings.SESSION_COOKIE_NAME in request.COOKIES
+            or "Authorization" in request.headers
+        ):
+            return None
+        language = translation.get_language_from_request(request)
+        return cache_key(request.path_info, language)
+
+    def timeout(self) -> int:
+        return settings.PAGE_CACHE_TIMEOUT + settings.PAGE_CACHE_STALE_TIMEOUT
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        key = self.cache_key(request)
+        if key is None:
+            return self.get_response(request)
+        cache = page_cache()
+        entry = cache.get(key)
+        if entry is not None and entry["fresh_until"] > time.time():
+            return from_entry(entry, "hit")
+        locked = cache.add(f"{key}:lock", 1, settings.PAGE_CACHE_LOCK_TIMEOUT)
+        if not locked:
+            if entry is not None:
+                return from_entry(entry, "stale")
+            deadline = time.monotonic() + settings.PAGE_CACHE_LOCK_TIMEOUT
+            while entry is None and time.monotonic() < deadline:
+                time.sleep(WAIT_INTERVAL)
+                entry = cache.get(key)
+            if entry is not None:
+                return from_entry(entry, "hit")
+        try:
+            response = self.get_response(request)
+            if is_cacheable(response):
+                cache.set(key, to_entry(response), self.timeout())
+        finally:
+            if locked:
+                cache.delete(f"{key}:lock")
+        response["X-Page-Cache"] = "miss"
+        return response
+
+    async def __acall__(self, request):
+        key = self.cache_key(request)
+        if key is None:
+            return await self.get_response(request)
+        cache = page_cache()
+        entry = await cache.aget(key)
+        if entry is not None and entry["fresh_until"] > time.time():
+            return from_entry(entry, "hit")
+        locked = await cache.aadd(f"{key}:lock", 1, settings.PAGE_CACHE_LOCK_TIMEOUT)
+        if not locked:
+            if entry is not None:
+                return from_entry(entry, "stale")
+            deadline = time.monotonic() + settings.PAGE_CACHE_LOCK_TIMEOUT
+            while entry is None and time.monotonic() < deadline:
+                await asyncio.sleep(WAIT_INTERVAL)
+                entry = await cache.aget(key)
+            if entry is not None:
+                return from_entry(entry, "hit")
+        try:
+            response = await self.get_response(request)
+            if is_cacheable(response):
+                await cache.aset(key, to_entry(response), self.timeout())
+        finally:
+            if locked:
+                await cache.adelete(f"{key}:lock")
+        response["X-Page-Cache"] = "miss"
+        return response
+
+
+class PurgeSerializer(serializers.Serializer):
+    paths = serializers.ListField(child=serializers.CharField(), required=False)
+
+
+class PageCachePurgeView(APIView):
+    """Drop cached pages: the given ``paths``, or all of them."""
+
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        serializer = PurgeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        paths = serializer.validated_data.get("paths", settings.PAGE_CACHE_PATHS)
+        purge(paths)
+        return Response({"purged": paths})
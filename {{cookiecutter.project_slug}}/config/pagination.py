@@ -0,0 +1,146 @@
+"""
+Project-wide pagination for the REST API.
+
+``CursorPagination`` is the default (see ``REST_FRAMEWORK`` in settings): it
+pages on an indexed, unique column with a keyset ``WHERE id < ...`` filter, so
+neither ``OFFSET`` nor ``COUNT(*)`` is ever issued, however large the table.
+
+Async views fetch the page with ``CursorPagination.apaginate_queryset``,
+which iterates the page query with ``aiterator()``.
+
+Endpoints that really need a total can use ``EstimatedCountPagination``,
+which reads the planner estimate from ``pg_class.reltuples`` instead of
+counting unfiltered tables.
+"""
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination as BaseCursorPagination
+from rest_framework.pagination import _reverse_ordering
+from rest_framework.pagination import PageNumberPagination
+
+
+class CursorPagination(BaseCursorPagination):
+    """Keyset pagination on the primary key, newest first.
+
+    Override ``ordering`` on the view (or a subclass) with another unique,
+    indexed column such as ``-date_joined`` where that suits the endpoint.
+    """
+
+    ordering = "-id"
+    page_size_query_param = "page_size"
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+    # DRF's paginate_queryset, split around the query so that the page can
+    # also be fetched from async views.
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async ``paginate_queryset``."""
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.set_page([obj async for obj in page_queryset.aiterator()])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Return the query for the requested page and the item following it."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, position = self.cursor or (0, False, None)
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            order = self.ordering[0]
+            order_attr = order.lstrip("-")
+            # (cursor reversed) XOR (queryset reversed)
+            lookup = "lt" if self.cursor.reverse != order.startswith("-") else "gt"
+            queryset = queryset.filter(**{f"{order_attr}__{lookup}": position})
+        return queryset[offset : offset + self.page_size + 1]
+
+    def set_page(self, results: list) -> list:
+        """Keep the page out of ``results`` and work out the links around it."""
+        offset, reverse, position = self.cursor or (0, False, None)
+        self.page = results[: self.page_size]
+        has_following = len(results) > len(self.page)
+        following = None
+        if has_following:
+            following = self._get_position_from_instance(results[-1], self.ordering)
+
+        if reverse:
+            # The query ran in reverse order; return the page in the right one.
+            self.page.reverse()
+            self.has_next = position is not None or offset > 0
+            self.has_previous = has_following
+            if self.has_next:
+                self.next_position = position
+            if self.has_previous:
+                self.previous_position = following
+        else:
+            self.has_next = has_following
+            self.has_previous = position is not None or offset > 0
+            if self.has_next:
+                self.next_position = following
+            if self.has_previous:
+                self.previous_position = position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that trusts the PostgreSQL row estimate for large, unfiltered tables.
+
+    Filtered querysets, and tables whose estimate is below
+    ``exact_count_threshold``, are still counted exactly.
+    """
+
+    exact_count_threshold = 10_000
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        query = getattr(queryset, "query", None)
+        if query is None or query.where or query.distinct or query.is_sliced:
+            return super().count
+        estimate = estimated_row_count(queryset.model, using=queryset.db)
+        if estimate < self.exact_count_threshold:
+            return super().count
+        return estimate
+
+
+def estimated_row_count(model, using: str = "default") -> int:
+    """Return ``pg_class.reltuples`` for the model's table.
+
+    Tables that have never been vacuumed or analyzed report ``-1``.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [connections[using].ops.quote_name(model._meta.db_table)],  # noqa: SLF001
+        )
+        row = cursor.fetchone()
+    return row[0] if row else -1
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """Page-number pagination reporting an approximate total ``count``."""
+
+    django_paginator_class = EstimatedCountPaginator
+    page_size_query_param = "page_size"
+    max_page_size = settings.API_MAX_PAGE_SIZE
@@ -38,6 +38,25 @@ DATABASES = {
 }
 {%- endif %}
 DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# https://docs.djangoproject.com/en/dev/topics/db/multi-db/#automatic-database-routing
+DATABASE_REPLICA_URL = env("DATABASE_REPLICA_URL", default="")
+if DATABASE_REPLICA_URL:
+    DATABASES["replica"] = env.db("DATABASE_REPLICA_URL")
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+    DATABASE_ROUTERS = ["config.db_router.PrimaryReplicaRouter"]
+# Replicas lagging further behind than this (seconds) are skipped for reads.
+DATABASE_REPLICA_MAX_LAG = env.float("DATABASE_REPLICA_MAX_LAG", default=5.0)
+# Clients keep reading from the primary for this long (seconds) after a write.
+DATABASE_REPLICA_STICKY_SECONDS = env.int("DATABASE_REPLICA_STICKY_SECONDS", default=10)
+# https://docs.djangoproject.com/en/dev/ref/databases/#connection-pool
+DATABASE_POOL = env.bool("DATABASE_POOL", default=False)
+if DATABASE_POOL:
+    for database in DATABASES.values():
+        database.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": env.int("DATABASE_POOL_MIN_SIZE", default=2),
+            "max_size": env.int("DATABASE_POOL_MAX_SIZE", default=10),
+            "timeout": env.float("DATABASE_POOL_TIMEOUT", default=10.0),
+        }
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 ROOT_URLCONF = "config.urls"
@@ -74,6 +93,9 @@ THIRD_PARTY_APPS = [
 
 LOCAL_APPS = [
     "{{ cookiecutter.project_slug }}.users",
+    {%- if cookiecutter.use_celery == 'y' %}
+    "{{ cookiecutter.project_slug }}.outbox",
+    {%- endif %}
 ]
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
@@ -86,11 +108,17 @@ AUTH_USER_MODEL = "users.User"
 LOGIN_URL = "admin:login"
 
 PASSWORD_HASHERS = [
-    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "config.hashers.Argon2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
     "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
 ]
+# https://argon2-cffi.readthedocs.io/en/stable/parameters.html
+ARGON2_TIME_COST = env.int("DJANGO_ARGON2_TIME_COST", default=2)
+ARGON2_MEMORY_COST = env.int("DJANGO_ARGON2_MEMORY_COST", default=102400)
+ARGON2_PARALLELISM = env.int("DJANGO_ARGON2_PARALLELISM", default=8)
+# Concurrent password hashes per process, and the threads async logins hash on
+PASSWORD_HASHING_WORKERS = env.int("DJANGO_PASSWORD_HASHING_WORKERS", default=2)
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -108,9 +136,11 @@ MIDDLEWARE = [
     "django_prometheus.middleware.PrometheusMiddleware",
 {%- endif %}
     "django.middleware.security.SecurityMiddleware",
+    "config.page_cache.PageCacheMiddleware",
+    "config.db_router.ReplicaRoutingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
 {%- if cookiecutter.use_whitenoise == 'y' %}
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "config.staticfiles.WhiteNoiseMiddleware",
 {%- endif %}
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
@@ -123,6 +153,24 @@ MIDDLEWARE = [
     "django_prometheus.middleware.ResponseMetricsMiddleware",
 {%- endif %}
 ]
+# Middleware of the handler serving API paths (see config.handlers). JWT calls
+# need no sessions, CSRF, messages or frame options, and pages are not cached.
+API_MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if middleware
+    not in {
+        "config.page_cache.PageCacheMiddleware",
+{%- if cookiecutter.use_whitenoise == 'y' %}
+        "config.staticfiles.WhiteNoiseMiddleware",
+{%- endif %}
+        "django.contrib.sessions.middleware.SessionMiddleware",
+        "django.middleware.csrf.CsrfViewMiddleware",
+        "django.contrib.auth.middleware.AuthenticationMiddleware",
+        "django.contrib.messages.middleware.MessageMiddleware",
+        "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    }
+]
 
 STATIC_ROOT = str(BASE_DIR / "staticfiles")
 STATIC_URL = "/static/"
@@ -138,6 +186,19 @@ MEDIA_URL = "/media/"
 # No templates for pure API
 # FIXTURE_DIRS = (str(APPS_DIR / "fixtures"),)
 
+# Page cache
+# ------------------------------------------------------------------------------
+# Pages served to anonymous visitors from the cache (see config.page_cache).
+PAGE_CACHE_PATHS = env.list("DJANGO_PAGE_CACHE_PATHS", default=["/", "/about/"])
+PAGE_CACHE_ALIAS = "default"
+# Seconds an entry is fresh, then served stale while it is rendered again.
+PAGE_CACHE_TIMEOUT = env.int("DJANGO_PAGE_CACHE_TIMEOUT", default=300)
+PAGE_CACHE_STALE_TIMEOUT = env.int("DJANGO_PAGE_CACHE_STALE_TIMEOUT", default=3600)
+# Seconds other requests wait for the one rendering a missing entry.
+PAGE_CACHE_LOCK_TIMEOUT = 10
+# Part of every key; change it (e.g. to the release) to drop all entries.
+PAGE_CACHE_VERSION = env("DJANGO_PAGE_CACHE_VERSION", default="1")
+
 SESSION_COOKIE_HTTPONLY = True
 CSRF_COOKIE_HTTPONLY = True
 X_FRAME_OPTIONS = "DENY"
@@ -169,6 +230,9 @@ LOGGING = {
     "root": {"level": "INFO", "handlers": ["console"]},
 }
 
+# Buffered JWT logins are written to users_user.last_login this often (seconds).
+LAST_LOGIN_FLUSH_INTERVAL = env.int("DJANGO_LAST_LOGIN_FLUSH_INTERVAL", default=60)
+
 REDIS_URL = env("REDIS_URL", default="redis://{% if cookiecutter.use_docker == 'y' %}redis{%else%}localhost{% endif %}:6379/0")
 REDIS_SSL = REDIS_URL.startswith("rediss://")
 
@@ -181,10 +245,15 @@ CELERY_BROKER_URL = REDIS_URL
 CELERY_BROKER_USE_SSL = {"ssl_cert_reqs": ssl.CERT_NONE} if REDIS_SSL else None
 CELERY_RESULT_BACKEND = REDIS_URL
 CELERY_REDIS_BACKEND_USE_SSL = CELERY_BROKER_USE_SSL
-CELERY_RESULT_EXTENDED = True
+# Results are only stored for tasks that opt in with ignore_result=False, and
+# only for as long as the caller could still want them.
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_RESULT_EXPIRES = 60 * 60
 CELERY_RESULT_BACKEND_ALWAYS_RETRY = True
 CELERY_RESULT_BACKEND_MAX_RETRIES = 10
-CELERY_ACCEPT_CONTENT = ["json"]
+# Tasks with large payloads can opt in to serializer="msgpack" and
+# compression="zlib" (see benchmarks/celery_results.py).
+CELERY_ACCEPT_CONTENT = ["json", "msgpack"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TASK_TIME_LIMIT = 5 * 60
@@ -193,23 +262,52 @@ CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 CELERY_WORKER_SEND_TASK_EVENTS = True
 CELERY_TASK_SEND_SENT_EVENT = True
 CELERY_WORKER_HIJACK_ROOT_LOGGER = False
+# Queues are declared in config.celery_app, along with the worker profile of each.
+# "fast" is for short, latency-sensitive tasks (emails, notifications), "bulk"
+# for long or high-volume ones; everything else goes to "default".
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_ROUTES = {
+    "{{ cookiecutter.project_slug }}.users.tasks.get_users_count": {"queue": "fast"},
+}
+# Redis has no native priorities: each priority gets its own list, polled from
+# 0 (first) to 9. Tasks default to the middle so they can be moved either way,
+# e.g. task.apply_async(priority=0).
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "priority_steps": list(range(10)),
+    "sep": ":",
+    "queue_order_strategy": "priority",
+}
+CELERY_TASK_DEFAULT_PRIORITY = 5
+CELERY_BEAT_SCHEDULE = {
+    "flush-last-login": {
+        "task": "{{ cookiecutter.project_slug }}.users.tasks.flush_last_login",
+        "schedule": LAST_LOGIN_FLUSH_INTERVAL,
+    },
+}
 
 {%- endif %}
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "config.authentication.LazyUserJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_PAGINATION_CLASS": "config.pagination.CursorPagination",
+    "PAGE_SIZE": env.int("DJANGO_API_PAGE_SIZE", default=50),
 }
+# Upper bound for the ?page_size= query parameter
+API_MAX_PAGE_SIZE = env.int("DJANGO_API_MAX_PAGE_SIZE", default=200)
 from datetime import timedelta
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
-    "UPDATE_LAST_LOGIN": True,
+    # Logins are buffered by config.authentication.TokenObtainPairSerializer.
+    "UPDATE_LAST_LOGIN": False,
+    "TOKEN_OBTAIN_SERIALIZER": "config.authentication.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "config.authentication.TokenRefreshSerializer",
 }
 CORS_URLS_REGEX = r"^/api/.*$"
 SPECTACULAR_SETTINGS = {
@@ -219,6 +317,38 @@ SPECTACULAR_SETTINGS = {
     "SERVE_PERMISSIONS": ["rest_framework.permissions.IsAdminUser"],
     "SCHEMA_PATH_PREFIX": "/api/",
 }
+{%- if cookiecutter.cloud_provider == 'AWS' %}
+
+# Uploads
+# ------------------------------------------------------------------------------
+# Size of the parts of multipart uploads to S3 (at least 5 MiB).
+S3_UPLOAD_PART_SIZE = env.int("DJANGO_S3_UPLOAD_PART_SIZE", default=8 * 1024 * 1024)
+# Parts of one upload sent at once; also bounds the memory a streamed upload uses.
+S3_UPLOAD_CONCURRENCY = env.int("DJANGO_S3_UPLOAD_CONCURRENCY", default=4)
+S3_UPLOAD_MAX_SIZE = env.int("DJANGO_S3_UPLOAD_MAX_SIZE", default=5 * 1024**3)
+# Seconds the presigned part URLs stay valid.
+S3_UPLOAD_URL_EXPIRY = env.int("DJANGO_S3_UPLOAD_URL_EXPIRY", default=60 * 60)
+{%- endif %}
+{%- if cookiecutter.use_async == 'y' %}
+
+# Websockets
+# ------------------------------------------------------------------------------
+# Sockets served per process; further handshakes are refused.
+WEBSOCKET_MAX_CONNECTIONS = env.int("DJANGO_WEBSOCKET_MAX_CONNECTIONS", default=10000)
+# Outgoing bytes buffered per socket before WEBSOCKET_OVERFLOW_POLICY applies:
+# "drop" discards new messages, "close" disconnects the client.
+WEBSOCKET_MAX_QUEUED_BYTES = env.int(
+    "DJANGO_WEBSOCKET_MAX_QUEUED_BYTES",
+    default=1024 * 1024,
+)
+WEBSOCKET_OVERFLOW_POLICY = env("DJANGO_WEBSOCKET_OVERFLOW_POLICY", default="drop")
+# Seconds a client may stay silent before it is disconnected (0 disables).
+WEBSOCKET_IDLE_TIMEOUT = env.int("DJANGO_WEBSOCKET_IDLE_TIMEOUT", default=60)
+WEBSOCKET_MAX_MESSAGES_PER_SECOND = env.int(
+    "DJANGO_WEBSOCKET_MAX_MESSAGES_PER_SECOND",
+    default=20,
+)
+{%- endif %}
 {%- if cookiecutter.use_channels == "y" %}
 ASGI_APPLICATION = "config.asgi.application"
 
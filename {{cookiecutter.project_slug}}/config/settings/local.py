@@ -56,6 +56,24 @@ if env("USE_DOCKER") == "yes":
 {%- endif %}
 
 INSTALLED_APPS += ["django_extensions"]
+{%- if cookiecutter.cloud_provider == 'AWS' %}
+
+# Media on a local S3-compatible store (e.g. MinIO), to try the uploads API.
+AWS_S3_ENDPOINT_URL = env("DJANGO_AWS_S3_ENDPOINT_URL", default=None)
+if AWS_S3_ENDPOINT_URL:
+    AWS_ACCESS_KEY_ID = env("DJANGO_AWS_ACCESS_KEY_ID")
+    AWS_SECRET_ACCESS_KEY = env("DJANGO_AWS_SECRET_ACCESS_KEY")
+    AWS_STORAGE_BUCKET_NAME = env("DJANGO_AWS_STORAGE_BUCKET_NAME")
+    STORAGES = {
+        "default": {
+            "BACKEND": "storages.backends.s3.S3Storage",
+            "OPTIONS": {"location": "media", "file_overwrite": False},
+        },
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+        },
+    }
+{%- endif %}
 {% if cookiecutter.use_celery == 'y' -%}
 {%- if cookiecutter.use_docker == 'n' -%}
 CELERY_TASK_ALWAYS_EAGER = True
@@ -1,16 +1,26 @@
 # ruff: noqa: E501
-
+{% if cookiecutter.cloud_provider == 'AWS' %}
+from boto3.s3.transfer import TransferConfig
+{% endif %}
 from .base import *  # noqa: F403
+from .base import DATABASE_POOL
 from .base import DATABASES
 from .base import INSTALLED_APPS
 from .base import REDIS_URL
+{%- if cookiecutter.cloud_provider == 'AWS' %}
+from .base import S3_UPLOAD_CONCURRENCY
+from .base import S3_UPLOAD_PART_SIZE
+{%- endif %}
 from .base import SPECTACULAR_SETTINGS
 from .base import env
 
 SECRET_KEY = env("DJANGO_SECRET_KEY")
 ALLOWED_HOSTS = env.list("DJANGO_ALLOWED_HOSTS", default=["{{ cookiecutter.domain_name }}"])
 
-DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
+if not DATABASE_POOL:
+    # Persistent connections and the psycopg pool are mutually exclusive.
+    for database in DATABASES.values():
+        database["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
@@ -48,11 +58,19 @@ _AWS_EXPIRY = 60 * 60 * 24 * 7
 AWS_S3_OBJECT_PARAMETERS = {
     "CacheControl": f"max-age={_AWS_EXPIRY}, s-maxage={_AWS_EXPIRY}, must-revalidate",
 }
+# Files written through the storage spill to disk past one upload part.
 AWS_S3_MAX_MEMORY_SIZE = env.int(
     "DJANGO_AWS_S3_MAX_MEMORY_SIZE",
-    default=100_000_000,
+    default=S3_UPLOAD_PART_SIZE,
+)
+AWS_S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=S3_UPLOAD_PART_SIZE,
+    multipart_chunksize=S3_UPLOAD_PART_SIZE,
+    max_concurrency=S3_UPLOAD_CONCURRENCY,
 )
 AWS_S3_REGION_NAME = env("DJANGO_AWS_S3_REGION_NAME", default=None)
+# For S3-compatible stores, e.g. a local MinIO.
+AWS_S3_ENDPOINT_URL = env("DJANGO_AWS_S3_ENDPOINT_URL", default=None)
 AWS_S3_CUSTOM_DOMAIN = env("DJANGO_AWS_S3_CUSTOM_DOMAIN", default=None)
 aws_s3_domain = AWS_S3_CUSTOM_DOMAIN or f"{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com"
 {% elif cookiecutter.cloud_provider == 'GCP' %}
@@ -71,7 +89,7 @@ STORAGES = {
         "BACKEND": "django.core.files.storage.FileSystemStorage",
     },
     "staticfiles": {
-        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+        "BACKEND": "config.staticfiles.CompressedManifestStaticFilesStorage",
     },
 {%- elif cookiecutter.cloud_provider == 'AWS' %}
     "default": {
@@ -83,11 +101,11 @@ STORAGES = {
     },
     {%- if cookiecutter.use_whitenoise == 'y' %}
     "staticfiles": {
-        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+        "BACKEND": "config.staticfiles.CompressedManifestStaticFilesStorage",
     },
     {%- else %}
     "staticfiles": {
-        "BACKEND": "storages.backends.s3.S3Storage",
+        "BACKEND": "config.staticfiles.S3StaticStorage",
         "OPTIONS": {
             "location": "static",
             "default_acl": "public-read",
@@ -104,11 +122,11 @@ STORAGES = {
     },
     {%- if cookiecutter.use_whitenoise == 'y' %}
     "staticfiles": {
-        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+        "BACKEND": "config.staticfiles.CompressedManifestStaticFilesStorage",
     },
     {%- else %}
     "staticfiles": {
-        "BACKEND": "storages.backends.gcloud.GoogleCloudStorage",
+        "BACKEND": "config.staticfiles.GoogleCloudStaticStorage",
         "OPTIONS": {
             "location": "static",
             "default_acl": "publicRead",
@@ -125,13 +143,14 @@ STORAGES = {
     },
     {%- if cookiecutter.use_whitenoise == 'y' %}
     "staticfiles": {
-        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+        "BACKEND": "config.staticfiles.CompressedManifestStaticFilesStorage",
     },
     {%- else %}
     "staticfiles": {
-        "BACKEND": "storages.backends.azure_storage.AzureStorage",
+        "BACKEND": "config.staticfiles.AzureStaticStorage",
         "OPTIONS": {
             "location": "static",
+            "overwrite_files": True,
         },
     },
     {%- endif %}
@@ -142,19 +161,16 @@ STORAGES = {
 {%- if cookiecutter.cloud_provider == 'AWS' %}
 MEDIA_URL = f"https://{aws_s3_domain}/media/"
 {%- if cookiecutter.use_whitenoise == 'n' %}
-COLLECTFASTA_STRATEGY = "collectfasta.strategies.boto3.Boto3Strategy"
 STATIC_URL = f"https://{aws_s3_domain}/static/"
 {%- endif %}
 {%- elif cookiecutter.cloud_provider == 'GCP' %}
 MEDIA_URL = f"https://storage.googleapis.com/{GS_BUCKET_NAME}/media/"
 {%- if cookiecutter.use_whitenoise == 'n' %}
-COLLECTFASTA_STRATEGY = "collectfasta.strategies.gcloud.GoogleCloudStrategy"
 STATIC_URL = f"https://storage.googleapis.com/{GS_BUCKET_NAME}/static/"
 {%- endif %}
 {%- elif cookiecutter.cloud_provider == 'Azure' %}
 MEDIA_URL = f"https://{AZURE_ACCOUNT_NAME}.blob.core.windows.net/media/"
 {%- if cookiecutter.use_whitenoise == 'n' %}
-COLLECTFASTA_STRATEGY = "collectfasta.strategies.azure.AzureBlobStrategy"
 STATIC_URL = f"https://{AZURE_ACCOUNT_NAME}.blob.core.windows.net/static/"
 {%- endif %}
 {%- endif %}
@@ -225,10 +241,6 @@ ANYMAIL = {}
 {%- endif %}
 
 
-{%- if cookiecutter.use_whitenoise == 'n' and cookiecutter.cloud_provider in ('AWS', 'GCP', 'Azure') -%}
-INSTALLED_APPS = ["collectfasta", *INSTALLED_APPS]
-{% endif %}
-
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": True,
@@ -0,0 +1,318 @@
+"""
+Precompressed static files.
+
+``collectstatic`` stores Brotli (``.br``), Zstandard (``.zst``) and gzip
+(``.gz``) variants of every text-like static file, each at its codec's
+highest level, so nothing is compressed at request time. Files are
+compressed in a process pool, one per core at a time.
+{%- if cookiecutter.use_whitenoise == 'y' %}
+
+``CompressedManifestStaticFilesStorage`` writes the variants next to the
+collected files and ``WhiteNoiseMiddleware`` serves the smallest one the
+client accepts. Hashed names only change with the content, and variants keep
+the modification time of their source, so files compressed by an earlier
+run are skipped. So are files none of whose variants were worth keeping:
+``precompressed.json`` records their modification time.
+{%- else %}
+
+The static storage uploads each variant under its own name (``app.css.br``)
+with the Content-Type of the source and the matching Content-Encoding; have
+the CDN pick the variant from the request's Accept-Encoding.
+
+``manage.py syncstatic`` replaces ``collectstatic`` for the bucket: it keeps
+the content hashes of the uploaded files in ``syncstatic.json`` next to
+them, and only uploads (and compresses) the files whose hash changed, a
+bounded number at a time. When nothing changed, it only hashes the local
+files and reads that manifest. The manifest lists every uploaded file,
+including those no variant was kept for, so they are not compressed again
+either.
+{%- endif %}
+"""
+
+import gzip
+{%- if cookiecutter.use_whitenoise == 'n' %}
+import hashlib
+{%- endif %}
+import json
+{%- if cookiecutter.use_whitenoise == 'n' %}
+import mimetypes
+{%- else %}
+import os
+{%- endif %}
+from concurrent.futures import ProcessPoolExecutor
+{%- if cookiecutter.use_whitenoise == 'n' %}
+from concurrent.futures import ThreadPoolExecutor
+{%- endif %}
+from functools import cache
+{%- if cookiecutter.use_whitenoise == 'y' %}
+from pathlib import Path
+from wsgiref.headers import Headers
+{%- endif %}
+
+import brotli
+import zstandard
+{%- if cookiecutter.use_whitenoise == 'y' %}
+from whitenoise import middleware
+from whitenoise import storage
+from whitenoise.responders import MissingFileError
+from whitenoise.responders import StaticFile
+{%- else %}
+from django.apps import apps
+from django.contrib.staticfiles import finders
+from django.core.files.base import ContentFile
+{%- if cookiecutter.cloud_provider == 'AWS' %}
+from storages.backends.s3 import S3Storage
+{%- elif cookiecutter.cloud_provider == 'GCP' %}
+from storages.backends.gcloud import GoogleCloudStorage
+{%- elif cookiecutter.cloud_provider == 'Azure' %}
+from storages.backends.azure_storage import AzureStorage
+{%- endif %}
+{%- endif %}
+
+# Content-Encoding -> file suffix.
+ENCODINGS = {"br": ".br", "zstd": ".zst", "gzip": ".gz"}
+COMPRESS_EXTENSIONS = (
+    ".css",
+    ".eot",
+    ".html",
+    ".ico",
+    ".js",
+    ".json",
+    ".map",
+    ".mjs",
+    ".otf",
+    ".svg",
+    ".ttf",
+    ".txt",
+    ".wasm",
+    ".xml",
+)
+# Variants saving less than 5% are not worth serving.
+MIN_RATIO = 0.95
+# Browsers reject zstd windows over 8 MiB (RFC 9659).
+ZSTD_WINDOW_LOG = 23
+{%- if cookiecutter.use_whitenoise == 'y' %}
+# Modification times of the files no variant was kept for.
+SKIPPED_NAME = "precompressed.json"
+{%- else %}
+# Content hashes of the synced static files, stored with them.
+MANIFEST_NAME = "syncstatic.json"
+{%- endif %}
+
+
+def should_compress(name: str) -> bool:
+    return name.lower().endswith(COMPRESS_EXTENSIONS)
+
+
+def compress(data: bytes) -> dict[str, bytes]:
+    """Return the variants of ``data`` worth serving, keyed by Content-Encoding."""
+    zstd = zstandard.ZstdCompressor(
+        compression_params=zstandard.ZstdCompressionParameters.from_level(
+            zstandard.MAX_COMPRESSION_LEVEL,
+            source_size=len(data),
+            window_log=ZSTD_WINDOW_LOG,
+        ),
+    )
+    variants = {
+        "br": brotli.compress(data, quality=11),
+        "zstd": zstd.compress(data),
+        "gzip": gzip.compress(data, compresslevel=9, mtime=0),
+    }
+    return {
+        encoding: variant
+        for encoding, variant in variants.items()
+        if len(variant) <= len(data) * MIN_RATIO
+    }
+
+
+@cache
+def _pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor()
+{%- if cookiecutter.use_whitenoise == 'y' %}
+
+
+def compress_file(path: str) -> list[str]:
+    """Write the variants of the file at ``path`` next to it; return their suffixes."""
+    source = Path(path)
+    stat = source.stat()
+    variants = compress(source.read_bytes())
+    for encoding, suffix in ENCODINGS.items():
+        target = source.with_name(source.name + suffix)
+        if encoding in variants:
+            target.write_bytes(variants[encoding])
+            os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        else:
+            target.unlink(missing_ok=True)
+    return [ENCODINGS[encoding] for encoding in variants]
+
+
+def is_compressed(path: str) -> bool:
+    """Whether the variants of ``path`` were written from its current content."""
+    source = Path(path)
+    mtime = source.stat().st_mtime_ns
+    variants = [source.with_name(source.name + suffix) for suffix in ENCODINGS.values()]
+    found = [variant for variant in variants if variant.exists()]
+    return bool(found) and all(variant.stat().st_mtime_ns == mtime for variant in found)
+
+
+class CompressedManifestStaticFilesStorage(
+    storage.CompressedManifestStaticFilesStorage,
+):
+    def compress_files(self, paths):
+        skipped_path = Path(self.path(SKIPPED_NAME))
+        skipped = json.loads(skipped_path.read_text()) if skipped_path.exists() else {}
+        mtimes = {
+            name: Path(self.path(name)).stat().st_mtime_ns
+            for name in paths
+            if should_compress(name)
+        }
+        names = [
+            name
+            for name, mtime in mtimes.items()
+            if skipped.get(name) != mtime and not is_compressed(self.path(name))
+        ]
+        results = _pool().map(
+            compress_file,
+            [self.path(name) for name in names],
+            chunksize=8,
+        )
+        for name, suffixes in zip(names, results, strict=True):
+            if suffixes:
+                skipped.pop(name, None)
+            else:
+                skipped[name] = mtimes[name]
+            for suffix in suffixes:
+                yield name, name + suffix
+        skipped_path.write_text(json.dumps(skipped, sort_keys=True))
+
+
+class WhiteNoiseMiddleware(middleware.WhiteNoiseMiddleware):
+    """WhiteNoise middleware that also serves the ``.zst`` variants."""
+
+    def get_static_file(self, path, url, stat_cache=None):
+        # Same as WhiteNoise.get_static_file, with our encodings.
+        if stat_cache is None and not Path(path).exists():
+            raise MissingFileError(path)
+        headers = Headers([])
+        self.add_mime_headers(headers, path, url)
+        self.add_cache_headers(headers, path, url)
+        if self.allow_all_origins:
+            headers["Access-Control-Allow-Origin"] = "*"
+        if self.add_headers_function is not None:
+            self.add_headers_function(headers, path, url)
+        return StaticFile(
+            path,
+            headers.items(),
+            stat_cache=stat_cache,
+            encodings={
+                encoding: path + suffix for encoding, suffix in ENCODINGS.items()
+            },
+        )
+{%- else %}
+
+
+class PrecompressedStorageMixin:
+    """
+    Upload the variants of each compressible file next to it.
+
+    Only files being saved are compressed; ``syncstatic`` saves those whose
+    content changed, whether or not variants were kept for them before.
+    """
+
+    # Object parameter names of the backend (see get_object_parameters).
+    content_type_key = "content_type"
+    content_encoding_key = "content_encoding"
+
+    def _save(self, name, content):
+        compressible = should_compress(name) and name != MANIFEST_NAME
+        data = content.read() if compressible else b""
+        content.seek(0)
+        name = super()._save(name, content)
+        if data:
+            variants = _pool().submit(compress, data).result()
+            for encoding, variant in variants.items():
+                super()._save(name + ENCODINGS[encoding], ContentFile(variant))
+        return name
+
+    def get_object_parameters(self, name):
+        params = super().get_object_parameters(name)
+        for encoding, suffix in ENCODINGS.items():
+            source = name.removesuffix(suffix)
+            if source != name and should_compress(source):
+                content_type, _ = mimetypes.guess_type(source)
+                content_type = content_type or "application/octet-stream"
+                params[self.content_type_key] = content_type
+                params[self.content_encoding_key] = encoding
+        return params
+{%- if cookiecutter.cloud_provider == 'AWS' %}
+
+
+class S3StaticStorage(PrecompressedStorageMixin, S3Storage):
+    content_type_key = "ContentType"
+    content_encoding_key = "ContentEncoding"
+
+{%- elif cookiecutter.cloud_provider == 'GCP' %}
+
+
+class GoogleCloudStaticStorage(PrecompressedStorageMixin, GoogleCloudStorage):
+    pass
+{%- elif cookiecutter.cloud_provider == 'Azure' %}
+
+
+class AzureStaticStorage(PrecompressedStorageMixin, AzureStorage):
+    pass
+{%- endif %}
+
+
+def find_static_files():
+    """Map the destination name of each static file to its source, as collectstatic."""
+    ignore_patterns = apps.get_app_config("staticfiles").ignore_patterns
+    found = {}
+    for finder in finders.get_finders():
+        for path, storage in finder.list(ignore_patterns):
+            prefix = getattr(storage, "prefix", None)
+            name = f"{prefix}/{path}" if prefix else path
+            # The first finder wins, as with collectstatic.
+            found.setdefault(name, (storage, path))
+    return found
+
+
+def file_hash(source) -> str:
+    storage, path = source
+    with storage.open(path) as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def read_manifest(storage) -> dict[str, str]:
+    if not storage.exists(MANIFEST_NAME):
+        return {}
+    with storage.open(MANIFEST_NAME) as manifest:
+        return json.load(manifest)
+
+
+def upload(storage, name: str, source) -> None:
+    source_storage, path = source
+    with source_storage.open(path) as file:
+        # Static storages overwrite, so the name is kept.
+        storage.save(name, file)
+
+
+def sync_static(storage, *, workers: int, force=False, dry_run=False) -> list[str]:
+    """Upload the static files changed since the last sync; return their names.
+
+    The manifest is written once every upload succeeded, so a failed sync is
+    retried in full by the next one.
+    """
+    found = find_static_files()
+    with ThreadPoolExecutor(workers) as pool:
+        hashes = dict(zip(found, pool.map(file_hash, found.values()), strict=True))
+        stored = {} if force else read_manifest(storage)
+        changed = [name for name in hashes if stored.get(name) != hashes[name]]
+        if dry_run or not changed:
+            return changed
+        # list() re-raises the first failed upload.
+        list(pool.map(lambda name: upload(storage, name, found[name]), changed))
+    manifest = json.dumps(hashes, sort_keys=True).encode()
+    storage.save(MANIFEST_NAME, ContentFile(manifest))
+    return changed
+{%- endif %}
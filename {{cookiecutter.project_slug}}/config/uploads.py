@@ -0,0 +1,323 @@
+"""
+Large media uploads to S3.
+
+Clients upload straight to the bucket: ``POST /api/uploads/`` starts a
+multipart upload and returns a presigned URL per part, the client PUTs the
+parts (in parallel if it likes) and posts their ETags to
+``/api/uploads/complete/``. The file never passes through a worker.
+
+Uploads that do go through Django (``POST /api/uploads/stream/``) are
+streamed by ``S3MultipartUploadHandler``: parts are sent while the request
+body is still being read, ``S3_UPLOAD_CONCURRENCY`` at a time, and reading
+waits for a free slot. A worker holds at most ``S3_UPLOAD_CONCURRENCY + 1``
+parts of an upload, whatever its size.
+
+Both use the client of the default storage, so they work against any
+S3-compatible endpoint (``DJANGO_AWS_S3_ENDPOINT_URL``), e.g. a local MinIO.
+Interrupted uploads leave their parts behind; expire them with a bucket
+lifecycle rule (``AbortIncompleteMultipartUpload``).
+"""
+
+import math
+import posixpath
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core.files.storage import storages
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.core.files.uploadhandler import StopFutureHandlers
+from django.utils.text import get_valid_filename
+from rest_framework import serializers
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
+
+if TYPE_CHECKING:
+    from storages.backends.s3 import S3Storage
+
+# S3 limits: parts other than the last are at least 5 MiB, at most 10,000 parts.
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10_000
+
+
+class UploadsUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Uploads need S3 as the default storage."
+    default_code = "uploads_unavailable"
+
+
+def s3_storage() -> "S3Storage":
+    # django-storages is only installed in production; the API router still
+    # imports this module everywhere else.
+    try:
+        from storages.backends.s3 import S3Storage  # noqa: PLC0415
+    except ImportError:
+        raise UploadsUnavailable from None
+    storage = storages["default"]
+    if not isinstance(storage, S3Storage):
+        raise UploadsUnavailable
+    return storage
+
+
+def upload_name(user, filename: str) -> str:
+    """Return a storage name for ``filename`` that only ``user`` may complete."""
+    return f"uploads/{user.pk}/{uuid.uuid4().hex}/{get_valid_filename(filename)}"
+
+
+def check_owner(user, name: str) -> None:
+    if not name.startswith(f"uploads/{user.pk}/"):
+        raise PermissionDenied
+
+
+class MultipartUpload:
+    """An S3 multipart upload written sequentially and sent in concurrent parts."""
+
+    def __init__(self, storage: "S3Storage", name: str, content_type: str):
+        self.client = storage.connection.meta.client
+        self.bucket = storage.bucket_name
+        self.key = posixpath.join(storage.location, name)
+        self.part_size = max(settings.S3_UPLOAD_PART_SIZE, MIN_PART_SIZE)
+        params = storage.get_object_parameters(name)
+        params["ContentType"] = content_type
+        self.upload_id = self.client.create_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            **params,
+        )["UploadId"]
+        self.buffer = bytearray()
+        self.parts = []
+        self.pool = ThreadPoolExecutor(settings.S3_UPLOAD_CONCURRENCY)
+        self.slots = threading.BoundedSemaphore(settings.S3_UPLOAD_CONCURRENCY)
+
+    def write(self, data: bytes) -> None:
+        self.buffer += data
+        while len(self.buffer) >= self.part_size:
+            self._send(self.part_size)
+
+    def _send(self, size: int) -> None:
+        # Blocks the reader while every slot holds a part in flight.
+        self.slots.acquire()
+        body = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        future = self.pool.submit(self._upload_part, len(self.parts) + 1, body)
+        future.add_done_callback(lambda _: self.slots.release())
+        self.parts.append(future)
+
+    def _upload_part(self, number: int, body: bytes) -> dict:
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=number,
+            Body=body,
+        )
+        return {"PartNumber": number, "ETag": response["ETag"]}
+
+    def complete(self) -> None:
+        if self.buffer or not self.parts:
+            self._send(len(self.buffer))
+        try:
+            parts = [future.result() for future in self.parts]
+        except Exception:
+            self.abort()
+            raise
+        self.pool.shutdown()
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+
+    def abort(self) -> None:
+        self.pool.shutdown(cancel_futures=True)
+        self.client.abort_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+        )
+
+
+class StreamedUploadedFile(UploadedFile):
+    """A file already stored by ``S3MultipartUploadHandler``.
+
+    ``storage_name`` is its name in the default storage; assign it to a
+    ``FileField`` instead of saving the file again.
+    """
+
+    def __init__(self, storage_name, content_type, size, charset):
+        super().__init__(None, storage_name, content_type, size, charset)
+        self.storage_name = storage_name
+
+
+class S3MultipartUploadHandler(FileUploadHandler):
+    """Stream uploaded files to S3 while the request body is read."""
+
+    upload = None
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.name = upload_name(self.request.user, file_name)
+        content_type = self.content_type or "application/octet-stream"
+        self.upload = MultipartUpload(s3_storage(), self.name, content_type)
+        raise StopFutureHandlers
+
+    def receive_data_chunk(self, raw_data, start):
+        self.upload.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.upload.complete()
+        self.upload = None
+        return StreamedUploadedFile(
+            self.name,
+            self.content_type,
+            file_size,
+            self.charset,
+        )
+
+    def upload_interrupted(self):
+        if self.upload is not None:
+            self.upload.abort()
+
+
+class UploadSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=200)
+    content_type = serializers.CharField(default="application/octet-stream")
+    size = serializers.IntegerField(min_value=1)
+
+    def validate_size(self, value):
+        if value > settings.S3_UPLOAD_MAX_SIZE:
+            msg = f"Files are limited to {settings.S3_UPLOAD_MAX_SIZE} bytes."
+            raise serializers.ValidationError(msg)
+        return value
+
+
+class PartSerializer(serializers.Serializer):
+    part_number = serializers.IntegerField(min_value=1, max_value=MAX_PARTS)
+    etag = serializers.CharField()
+
+
+class CompleteUploadSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    upload_id = serializers.CharField()
+    parts = PartSerializer(many=True, allow_empty=False)
+
+
+class AbortUploadSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    upload_id = serializers.CharField()
+
+
+class UploadViewSet(ViewSet):
+    """Multipart uploads to the media bucket; see the module docstring."""
+
+    def create(self, request):
+        serializer = UploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        size = serializer.validated_data["size"]
+        storage = s3_storage()
+        client = storage.connection.meta.client
+        name = upload_name(request.user, serializer.validated_data["filename"])
+        key = posixpath.join(storage.location, name)
+        part_size = max(
+            settings.S3_UPLOAD_PART_SIZE,
+            MIN_PART_SIZE,
+            math.ceil(size / MAX_PARTS),
+        )
+        params = storage.get_object_parameters(name)
+        params["ContentType"] = serializer.validated_data["content_type"]
+        upload_id = client.create_multipart_upload(
+            Bucket=storage.bucket_name,
+            Key=key,
+            **params,
+        )["UploadId"]
+        # Signing is local; no request is made per part.
+        parts = [
+            {
+                "part_number": number,
+                "url": client.generate_presigned_url(
+                    "upload_part",
+                    Params={
+                        "Bucket": storage.bucket_name,
+                        "Key": key,
+                        "UploadId": upload_id,
+                        "PartNumber": number,
+                    },
+                    ExpiresIn=settings.S3_UPLOAD_URL_EXPIRY,
+                ),
+            }
+            for number in range(1, math.ceil(size / part_size) + 1)
+        ]
+        return Response(
+            {
+                "name": name,
+                "upload_id": upload_id,
+                "part_size": part_size,
+                "parts": parts,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=False, methods=["post"])
+    def complete(self, request):
+        serializer = CompleteUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        name = serializer.validated_data["name"]
+        check_owner(request.user, name)
+        storage = s3_storage()
+        parts = sorted(
+            serializer.validated_data["parts"],
+            key=lambda part: part["part_number"],
+        )
+        storage.connection.meta.client.complete_multipart_upload(
+            Bucket=storage.bucket_name,
+            Key=posixpath.join(storage.location, name),
+            UploadId=serializer.validated_data["upload_id"],
+            MultipartUpload={
+                "Parts": [
+                    {"PartNumber": part["part_number"], "ETag": part["etag"]}
+                    for part in parts
+                ],
+            },
+        )
+        return Response({"name": name, "url": storage.url(name)})
+
+    @action(detail=False, methods=["post"])
+    def abort(self, request):
+        serializer = AbortUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        name = serializer.validated_data["name"]
+        check_owner(request.user, name)
+        storage = s3_storage()
+        storage.connection.meta.client.abort_multipart_upload(
+            Bucket=storage.bucket_name,
+            Key=posixpath.join(storage.location, name),
+            UploadId=serializer.validated_data["upload_id"],
+        )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=["post"], parser_classes=[MultiPartParser])
+    def stream(self, request):
+        """Store the files of a multipart form, streaming them to S3."""
+        # Parsing has not started yet: authentication does not read the body.
+        request.upload_handlers = [S3MultipartUploadHandler(request)]
+        return Response(
+            [
+                {
+                    "field": field,
+                    "name": uploaded.storage_name,
+                    "size": uploaded.size,
+                    "url": s3_storage().url(uploaded.storage_name),
+                }
+                for field, uploaded in request.FILES.items()
+            ],
+            status=status.HTTP_201_CREATED,
+        )
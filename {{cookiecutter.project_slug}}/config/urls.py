@@ -4,6 +4,7 @@ from django.contrib import admin
 {%- if cookiecutter.use_async == 'y' %}
 from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 {%- endif %}
+from django.db import transaction
 from django.urls import include
 from django.urls import path
 from django.views import defaults as default_views
@@ -12,13 +13,21 @@ from drf_spectacular.views import SpectacularAPIView
 from drf_spectacular.views import SpectacularSwaggerView
 from rest_framework.authtoken.views import obtain_auth_token
 
+from config.database import health_check
+from config.page_cache import PageCachePurgeView
+
 urlpatterns = [
-    path("", TemplateView.as_view(template_name="pages/home.html"), name="home"),
+    path(
+        "",
+        transaction.non_atomic_requests(TemplateView.as_view(template_name="pages/home.html")),
+        name="home",
+    ),
     path(
         "about/",
-        TemplateView.as_view(template_name="pages/about.html"),
+        transaction.non_atomic_requests(TemplateView.as_view(template_name="pages/about.html")),
         name="about",
     ),
+    path("health/", health_check, name="health"),
     # Django Admin, use {% raw %}{% url 'admin:index' %}{% endraw %}
     path(settings.ADMIN_URL, admin.site.urls),
     # User management
@@ -39,6 +48,11 @@ urlpatterns += [
     path("api/", include("config.api_router")),
     # DRF auth token
     path("api/auth-token/", obtain_auth_token, name="obtain_auth_token"),
+    path(
+        "api/page-cache/purge/",
+        PageCachePurgeView.as_view(),
+        name="page-cache-purge",
+    ),
     path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
     path(
         "api/docs/",
@@ -1,13 +1,393 @@
+"""
+Websocket endpoint with topic subscriptions.
+
+Clients send ``ping`` (answered with ``pong!``) or JSON commands::
+
+    {"action": "subscribe", "topic": "news"}
+    {"action": "unsubscribe", "topic": "news"}
+
+and receive ``{"type": "event", "topic": ..., "payload": ...}`` messages for
+the topics they are subscribed to. Server code publishes with
+``publish(topic, payload)`` from views or Celery tasks (``apublish`` from async
+code).
+
+Events travel over Redis pub/sub. Each process holds a single subscription
+connection, shared by all of its sockets through ``TopicHub``, so the Redis
+connection count does not grow with the number of clients. Published events
+are encoded once and forwarded to every local subscriber as-is.
+
+Slow clients cannot hold up the others: outgoing frames are queued per
+connection up to ``WEBSOCKET_MAX_QUEUED_BYTES``, past which new frames are
+dropped or the socket is closed, depending on ``WEBSOCKET_OVERFLOW_POLICY``.
+Clients must send something (``ping`` will do) at least every
+``WEBSOCKET_IDLE_TIMEOUT`` seconds or they are disconnected, and clients
+sending more than ``WEBSOCKET_MAX_MESSAGES_PER_SECOND`` are closed. The
+counters in ``stats`` record the resulting drops and evictions.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import re
+import time
+from collections import Counter
+from collections import deque
+from functools import cache
+
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+{%- if cookiecutter.monitoring == "Prometheus" or cookiecutter.monitoring == "Grafana" %}
+from prometheus_client import REGISTRY
+from prometheus_client.core import CounterMetricFamily
+from prometheus_client.core import GaugeMetricFamily
+{%- endif %}
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "ws:"
+TOPIC_RE = re.compile(r"^[\w.:-]{1,100}$")
+# Seconds to wait before re-subscribing after the Redis connection drops.
+RECONNECT_DELAY = 1.0
+
+# Close codes, see RFC 6455 section 7.4.1.
+CLOSE_GOING_AWAY = 1001
+CLOSE_POLICY_VIOLATION = 1008
+CLOSE_INTERNAL_ERROR = 1011
+CLOSE_TRY_AGAIN_LATER = 1013
+
+# Connections open in this process.
+connections: set["Connection"] = set()
+# Process-wide counters: queued_bytes is a level, the others only grow.
+stats: Counter[str] = Counter()
+
+
+def _encode_event(topic: str, payload) -> str:
+    return json.dumps(
+        {"type": "event", "topic": topic, "payload": payload},
+        cls=DjangoJSONEncoder,
+    )
+
+
+@cache
+def _get_redis() -> redis.Redis:
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def publish(topic: str, payload) -> int:
+    """Send ``payload`` to every socket subscribed to ``topic``, in any process.
+
+    Returns the number of processes that received it.
+    """
+    return _get_redis().publish(CHANNEL_PREFIX + topic, _encode_event(topic, payload))
+
+
+async def apublish(topic: str, payload) -> int:
+    text = _encode_event(topic, payload)
+    return await hub.redis.publish(CHANNEL_PREFIX + topic, text)
+
+
+class Connection:
+    """A connected socket; all outgoing frames go through ``outbox`` in order."""
+
+    def __init__(self, send):
+        self.send = send
+        self.outbox: deque[tuple[str, int]] = deque()
+        self.queued_bytes = 0
+        self.ready = asyncio.Event()
+        self.close_code: int | None = None
+        # Set once the client has gone and the connection is cleaned up.
+        self.closed = asyncio.Event()
+        self.topics: set[str] = set()
+        self.last_seen = time.monotonic()
+        self.allowance = float(settings.WEBSOCKET_MAX_MESSAGES_PER_SECOND)
+
+    def deliver(self, text: str, size: int | None = None):
+        """Queue ``text`` without waiting for the client to read it.
+
+        ``size`` is the encoded length, for callers sending one text to many
+        connections.
+        """
+        if self.close_code is not None:
+            return
+        if size is None:
+            size = len(text.encode())
+        if self.queued_bytes + size > settings.WEBSOCKET_MAX_QUEUED_BYTES:
+            if settings.WEBSOCKET_OVERFLOW_POLICY == "close":
+                stats["evicted_slow"] += 1
+                self.close(CLOSE_TRY_AGAIN_LATER)
+            else:
+                stats["dropped_messages"] += 1
+            return
+        self.outbox.append((text, size))
+        self.queued_bytes += size
+        stats["queued_bytes"] += size
+        self.ready.set()
+
+    def close(self, code: int, *, flush: bool = False):
+        """Close the socket, after sending the queued frames if ``flush``."""
+        if self.close_code is None:
+            self.close_code = code
+            if not flush:
+                self._discard_outbox()
+            self.ready.set()
+
+    def _discard_outbox(self):
+        stats["queued_bytes"] -= self.queued_bytes
+        self.queued_bytes = 0
+        self.outbox.clear()
+
+    def touch(self) -> bool:
+        """Record an incoming message; return False once over the rate limit."""
+        now = time.monotonic()
+        rate = settings.WEBSOCKET_MAX_MESSAGES_PER_SECOND
+        # Token bucket refilled at ``rate`` per second, holding one second's worth.
+        self.allowance = min(rate, self.allowance + (now - self.last_seen) * rate)
+        self.last_seen = now
+        if self.allowance < 1:
+            return False
+        self.allowance -= 1
+        return True
+
+    async def write_loop(self):
+        try:
+            while True:
+                await self.ready.wait()
+                self.ready.clear()
+                while self.outbox:
+                    text, size = self.outbox.popleft()
+                    self.queued_bytes -= size
+                    stats["queued_bytes"] -= size
+                    await self.send({"type": "websocket.send", "text": text})
+                if self.close_code is not None:
+                    code = self.close_code
+                    await self.send({"type": "websocket.close", "code": code})
+                    return
+        finally:
+            self._discard_outbox()
+
+
+async def _evict_idle():
+    """Close connections that have not sent anything within the idle timeout."""
+    timeout = settings.WEBSOCKET_IDLE_TIMEOUT
+    while connections:
+        await asyncio.sleep(timeout / 4)
+        deadline = time.monotonic() - timeout
+        for connection in list(connections):
+            if connection.last_seen < deadline and connection.close_code is None:
+                stats["evicted_idle"] += 1
+                connection.close(CLOSE_GOING_AWAY)
+
+
+_evictor: asyncio.Task | None = None
+
+
+def _register(connection: Connection):
+    global _evictor  # noqa: PLW0603
+    connections.add(connection)
+    if settings.WEBSOCKET_IDLE_TIMEOUT and (_evictor is None or _evictor.done()):
+        _evictor = asyncio.create_task(_evict_idle())
+
+
+def at_capacity() -> bool:
+    """Whether this process already serves ``WEBSOCKET_MAX_CONNECTIONS`` sockets."""
+    return len(connections) >= settings.WEBSOCKET_MAX_CONNECTIONS
+
+
+async def reject(receive, send):
+    """Refuse a websocket handshake; the client sees an HTTP 403."""
+    stats["rejected_connections"] += 1
+    await receive()
+    await send({"type": "websocket.close", "code": CLOSE_TRY_AGAIN_LATER})
+
+
+class TopicHub:
+    """Multiplex one Redis pub/sub connection onto the sockets of this process."""
+
+    def __init__(self):
+        self.subscribers: dict[str, set[Connection]] = {}
+        self._redis: redis.asyncio.Redis | None = None
+        self._pubsub = None
+        self._listener: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def redis(self) -> redis.asyncio.Redis:
+        if self._redis is None:
+            self._redis = redis.asyncio.Redis.from_url(settings.REDIS_URL)
+        return self._redis
+
+    async def subscribe(self, topic: str, connection: Connection):
+        async with self._lock:
+            if self._pubsub is None:
+                self._pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            if topic not in self.subscribers:
+                # Only record the topic once Redis has accepted it.
+                await self._pubsub.subscribe(CHANNEL_PREFIX + topic)
+                self.subscribers[topic] = set()
+            self.subscribers[topic].add(connection)
+            connection.topics.add(topic)
+            if self._listener is None or self._listener.done():
+                self._listener = asyncio.create_task(self._listen())
+
+    async def unsubscribe(self, topic: str, connection: Connection):
+        async with self._lock:
+            connection.topics.discard(topic)
+            subscribers = self.subscribers.get(topic)
+            if subscribers is None:
+                return
+            subscribers.discard(connection)
+            if not subscribers:
+                del self.subscribers[topic]
+                try:
+                    await self._pubsub.unsubscribe(CHANNEL_PREFIX + topic)
+                except redis.RedisError:
+                    # Events for the topic are ignored, and the listener only
+                    # re-subscribes to the remaining topics once it reconnects.
+                    logger.warning("Could not unsubscribe from topic %s", topic)
+
+    async def unsubscribe_all(self, connection: Connection):
+        for topic in list(connection.topics):
+            await self.unsubscribe(topic, connection)
+
+    def dispatch(self, channel: bytes, text: str):
+        topic = channel.decode()[len(CHANNEL_PREFIX) :]
+        size = len(text.encode())
+        for connection in self.subscribers.get(topic, ()):
+            connection.deliver(text, size)
+
+    async def close(self):
+        """Stop listening and release the Redis connections."""
+        if self._listener is not None:
+            self._listener.cancel()
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+        if self._redis is not None:
+            await self._redis.aclose()
+        self._listener = self._pubsub = self._redis = None
+
+    async def _listen(self):
+        while True:
+            if not self.subscribers:
+                await asyncio.sleep(1.0)
+                continue
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except redis.RedisError:
+                logger.exception("Lost the websocket pub/sub connection, reconnecting")
+                await asyncio.sleep(RECONNECT_DELAY)
+                await self._resubscribe()
+                continue
+            if message is not None and message["type"] == "message":
+                self.dispatch(message["channel"], message["data"].decode())
+
+    async def _resubscribe(self):
+        async with self._lock:
+            with contextlib.suppress(redis.RedisError):
+                await self._pubsub.aclose()
+            self._pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            channels = [CHANNEL_PREFIX + topic for topic in self.subscribers]
+            if channels:
+                try:
+                    await self._pubsub.subscribe(*channels)
+                except redis.RedisError:
+                    logger.warning("Could not re-subscribe to websocket topics yet")
+
+
+hub = TopicHub()
+
+
+async def handle_message(connection: Connection, text: str | None):
+    if text == "ping":
+        connection.deliver("pong!")
+        return
+    try:
+        command = json.loads(text or "")
+        action, topic = command["action"], command["topic"]
+    except (ValueError, TypeError, KeyError):
+        connection.deliver(json.dumps({"type": "error", "error": "invalid message"}))
+        return
+    if not isinstance(topic, str) or not TOPIC_RE.match(topic):
+        connection.deliver(json.dumps({"type": "error", "error": "invalid topic"}))
+    elif action == "subscribe":
+        try:
+            await hub.subscribe(topic, connection)
+        except redis.RedisError:
+            logger.exception("Could not subscribe to websocket topic %s", topic)
+            # Let the client reconnect rather than miss the topic's events.
+            connection.close(CLOSE_INTERNAL_ERROR)
+            return
+        connection.deliver(json.dumps({"type": "subscribed", "topic": topic}))
+    elif action == "unsubscribe":
+        await hub.unsubscribe(topic, connection)
+        connection.deliver(json.dumps({"type": "unsubscribed", "topic": topic}))
+    else:
+        connection.deliver(json.dumps({"type": "error", "error": "unknown action"}))
+
+
 async def websocket_application(scope, receive, send):
-    while True:
-        event = await receive()
+    connection = Connection(send)
+    writer = None
+    try:
+        while True:
+            event = await receive()
+
+            if event["type"] == "websocket.connect":
+                await send({"type": "websocket.accept"})
+                _register(connection)
+                writer = asyncio.create_task(connection.write_loop())
+
+            if event["type"] == "websocket.disconnect":
+                break
+
+            if event["type"] == "websocket.receive" and connection.close_code is None:
+                if connection.touch():
+                    await handle_message(connection, event.get("text"))
+                else:
+                    stats["rate_limited"] += 1
+                    connection.close(CLOSE_POLICY_VIOLATION)
+    finally:
+        connections.discard(connection)
+        if writer is not None:
+            writer.cancel()
+        # Stop queueing frames for a socket that is gone.
+        connection.close(CLOSE_GOING_AWAY)
+        await hub.unsubscribe_all(connection)
+        connection.closed.set()
+{%- if cookiecutter.monitoring == "Prometheus" or cookiecutter.monitoring == "Grafana" %}
+
+
+class WebsocketCollector:
+    """Expose the websocket backpressure counters to Prometheus."""
+
+    COUNTERS = {
+        "dropped_messages": "Outgoing messages dropped because a client was slow.",
+        "evicted_slow": "Connections closed because their send queue was full.",
+        "evicted_idle": "Connections closed for missing heartbeats.",
+        "rate_limited": "Connections closed for sending too many messages.",
+        "rejected_connections": "Handshakes refused at the connection limit.",
+    }
 
-        if event["type"] == "websocket.connect":
-            await send({"type": "websocket.accept"})
+    def collect(self):
+        yield GaugeMetricFamily(
+            "django_websocket_connections",
+            "Open websocket connections.",
+            value=len(connections),
+        )
+        yield GaugeMetricFamily(
+            "django_websocket_queued_bytes",
+            "Bytes waiting in websocket send queues.",
+            value=stats["queued_bytes"],
+        )
+        for key, documentation in self.COUNTERS.items():
+            yield CounterMetricFamily(
+                f"django_websocket_{key}",
+                documentation,
+                value=stats[key],
+            )
 
-        if event["type"] == "websocket.disconnect":
-            break
 
-        if event["type"] == "websocket.receive":
-            if event["text"] == "ping":
-                await send({"type": "websocket.send", "text": "pong!"})
+REGISTRY.register(WebsocketCollector())
+{%- endif %}
@@ -20,13 +20,24 @@ from pathlib import Path
 
 from django.core.wsgi import get_wsgi_application
 
+from config.handlers import APIWSGIHandler
+from config.handlers import is_api_path
+
 # This allows easy placement of apps within the interior
 # {{ cookiecutter.project_slug }} directory.
 BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
 sys.path.append(str(BASE_DIR / "{{ cookiecutter.project_slug }}"))
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
 
+django_application = get_wsgi_application()
+# API paths skip the session, CSRF and messages middleware.
+api_application = APIWSGIHandler()
+
+
 # This application object is used by any WSGI server configured to use this
 # file. This includes Django's development server, if the WSGI_APPLICATION
 # setting points here.
-application = get_wsgi_application()
+def application(environ, start_response):
+    if is_api_path(environ["PATH_INFO"]):
+        return api_application(environ, start_response)
+    return django_application(environ, start_response)
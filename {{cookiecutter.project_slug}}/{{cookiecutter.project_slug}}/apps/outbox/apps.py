@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboxConfig(AppConfig):
+    name = "{{ cookiecutter.project_slug }}.outbox"
+    verbose_name = _("Outbox")
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from {{ cookiecutter.project_slug }}.outbox.relay import DEFAULT_BATCH_SIZE
+from {{ cookiecutter.project_slug }}.outbox.relay import relay
+
+
+class Command(BaseCommand):
+    help = "Send tasks written to the outbox to the broker once committed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Messages claimed and sent per transaction.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.5,
+            help="Seconds to wait when the outbox is drained.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the outbox and exit instead of polling it.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        total = 0
+        while True:
+            sent = relay(batch_size)
+            total += sent
+            if sent < batch_size:
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"Sent {total} outbox messages."))
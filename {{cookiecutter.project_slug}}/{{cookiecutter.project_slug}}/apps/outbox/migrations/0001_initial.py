@@ -0,0 +1,26 @@
+import uuid
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxMessage",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("task_id", models.UUIDField(default=uuid.uuid4, editable=False)),
+                ("task_name", models.CharField(max_length=255, verbose_name="Task")),
+                ("args", models.JSONField(default=list)),
+                ("kwargs", models.JSONField(default=dict)),
+                ("options", models.JSONField(default=dict)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+import uuid
+
+from django.db.models import BigAutoField
+from django.db.models import CharField
+from django.db.models import DateTimeField
+from django.db.models import JSONField
+from django.db.models import Model
+from django.db.models import UUIDField
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboxMessage(Model):
+    """
+    A task to send to the broker once the transaction that wrote it commits.
+
+    Rows are deleted as soon as they are sent; see ``outbox.relay``.
+    """
+
+    id = BigAutoField(primary_key=True)
+    # Sent as the Celery task id, so a message sent twice is one task.
+    task_id = UUIDField(default=uuid.uuid4, editable=False)
+    task_name = CharField(_("Task"), max_length=255)
+    args = JSONField(default=list)
+    kwargs = JSONField(default=dict)
+    # apply_async options: queue, priority, countdown, ...
+    options = JSONField(default=dict)
+    created = DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"{self.task_name}[{self.task_id}]"
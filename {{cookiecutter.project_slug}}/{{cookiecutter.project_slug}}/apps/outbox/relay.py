@@ -0,0 +1,71 @@
+"""
+Transactional outbox for Celery tasks.
+
+With ``ATOMIC_REQUESTS``, a task sent from a view with ``delay`` may run
+before the view's transaction commits, or for a change that was rolled
+back. ``publish`` instead writes the task to the outbox table, in the same
+transaction as the change it is about, so it exists exactly when the change
+does::
+
+    publish(recompute_user, args=[user.pk], queue="bulk")
+
+The ``relay_outbox`` command then sends committed rows to the broker:
+``relay`` claims up to ``batch_size`` of them with ``SELECT ... FOR UPDATE
+SKIP LOCKED``, so several relays can run side by side without waiting on or
+sending each other's rows. It sends them over one broker connection and
+deletes them in the same transaction. A relay that dies after sending a
+batch but before committing sends it again; the task id stored with each
+row is reused, so tasks can recognise a message they already handled.
+"""
+
+from celery import current_app
+from django.db import transaction
+
+from .models import OutboxMessage
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def publish(task, args=(), kwargs=None, **options) -> OutboxMessage:
+    """Send ``task`` (a task or its name) once the current transaction commits."""
+    message = OutboxMessage(
+        task_name=getattr(task, "name", task),
+        args=list(args),
+        kwargs=kwargs or {},
+        options=options,
+    )
+    if current_app.conf.task_always_eager:
+        # No relay runs alongside eager tasks: run it on commit instead.
+        transaction.on_commit(
+            lambda: current_app.tasks[message.task_name].apply_async(
+                message.args,
+                message.kwargs,
+                task_id=str(message.task_id),
+                **message.options,
+            ),
+        )
+    else:
+        message.save()
+    return message
+
+
+def relay(batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Send up to ``batch_size`` committed messages and return how many were sent."""
+    with transaction.atomic():
+        claimed = OutboxMessage.objects.select_for_update(skip_locked=True)
+        messages = list(claimed.order_by("id")[:batch_size])
+        if not messages:
+            return 0
+        with current_app.producer_or_acquire() as producer:
+            for message in messages:
+                current_app.send_task(
+                    message.task_name,
+                    args=message.args,
+                    kwargs=message.kwargs,
+                    task_id=str(message.task_id),
+                    producer=producer,
+                    **message.options,
+                )
+        sent = [message.pk for message in messages]
+        OutboxMessage.objects.filter(pk__in=sent).delete()
+    return len(messages)
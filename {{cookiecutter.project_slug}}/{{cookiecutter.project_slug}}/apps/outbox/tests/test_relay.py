@@ -0,0 +1,109 @@
+import threading
+from contextlib import nullcontext
+
+import pytest
+from celery import current_app
+from django.db import connection
+from django.db import transaction
+
+from {{ cookiecutter.project_slug }}.outbox.models import OutboxMessage
+from {{ cookiecutter.project_slug }}.outbox.relay import publish
+from {{ cookiecutter.project_slug }}.outbox.relay import relay
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def sent(monkeypatch) -> list[dict]:
+    """Record the tasks the relay sends instead of sending them to the broker."""
+    sent = []
+    monkeypatch.setattr(current_app, "producer_or_acquire", nullcontext)
+    monkeypatch.setattr(
+        current_app,
+        "send_task",
+        lambda name, **options: sent.append({"name": name, **options}),
+    )
+    return sent
+
+
+def make_messages(count: int) -> list[OutboxMessage]:
+    return [
+        OutboxMessage.objects.create(
+            task_name=f"tasks.task_{i}",
+            args=[i],
+            options={"queue": "bulk"},
+        )
+        for i in range(count)
+    ]
+
+
+def test_publish_writes_message():
+    message = publish("tasks.recompute", args=(1,), queue="bulk")
+    stored = OutboxMessage.objects.get()
+    assert stored.task_id == message.task_id
+    assert stored.task_name == "tasks.recompute"
+    assert stored.args == [1]
+    assert stored.options == {"queue": "bulk"}
+
+
+def test_relay_sends_and_deletes_messages(sent):
+    messages = make_messages(3)
+    assert relay() == len(messages)
+    assert [task["name"] for task in sent] == [m.task_name for m in messages]
+    assert sent[0]["task_id"] == str(messages[0].task_id)
+    assert sent[0]["args"] == [0]
+    assert sent[0]["queue"] == "bulk"
+    assert not OutboxMessage.objects.exists()
+
+
+def test_relay_sends_one_batch(sent):
+    messages = make_messages(3)
+    assert relay(batch_size=2) == 2  # noqa: PLR2004
+    assert [task["name"] for task in sent] == [m.task_name for m in messages[:2]]
+    assert list(OutboxMessage.objects.all()) == messages[2:]
+
+
+def test_relay_empty_outbox(sent):
+    assert relay() == 0
+    assert sent == []
+
+
+def test_relay_keeps_messages_it_could_not_send(monkeypatch):
+    make_messages(1)
+
+    def send_task(name, **options):
+        raise ConnectionError
+
+    monkeypatch.setattr(current_app, "producer_or_acquire", nullcontext)
+    monkeypatch.setattr(current_app, "send_task", send_task)
+    with pytest.raises(ConnectionError):
+        relay()
+    assert OutboxMessage.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_relay_skips_locked_messages(sent):
+    locked, free = make_messages(2)
+    is_locked = threading.Event()
+    release = threading.Event()
+
+    def hold_lock():
+        # Another relay that has claimed the row but not committed yet.
+        try:
+            with transaction.atomic():
+                OutboxMessage.objects.select_for_update().get(pk=locked.pk)
+                is_locked.set()
+                release.wait(timeout=10)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=hold_lock)
+    thread.start()
+    try:
+        assert is_locked.wait(timeout=10)
+        assert relay() == 1
+    finally:
+        release.set()
+        thread.join()
+    assert [task["name"] for task in sent] == [free.task_name]
+    assert list(OutboxMessage.objects.all()) == [locked]
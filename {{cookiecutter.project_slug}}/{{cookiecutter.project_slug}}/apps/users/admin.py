@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.contrib.auth import admin as auth_admin
 from django.utils.translation import gettext_lazy as _
 
+from config.pagination import EstimatedCountPaginator
+
 from .forms import UserAdminChangeForm
 from .forms import UserAdminCreationForm
 from .models import User
@@ -34,7 +36,15 @@ class UserAdmin(auth_admin.UserAdmin):
         (_("Important dates"), {"fields": ("last_login", "date_joined")}),
     )
     list_display = ["{{cookiecutter.username_type}}", "name", "is_superuser"]
-    search_fields = ["name"]
+    # Backed by the trigram indexes declared on User.Meta.
+    {%- if cookiecutter.username_type == "email" %}
+    search_fields = ["email", "name"]
+    {%- else %}
+    search_fields = ["username", "name", "email"]
+    {%- endif %}
+    # Avoid COUNT(*) over the whole table on every changelist page.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     {%- if cookiecutter.username_type == "email" %}
     ordering = ["id"]
     add_fieldsets = (
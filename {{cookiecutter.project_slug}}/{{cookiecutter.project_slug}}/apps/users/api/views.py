@@ -1,17 +1,84 @@
+import hashlib
+import json
+{% if cookiecutter.use_async == "y" %}
+from asgiref.sync import sync_to_async
+{%- endif %}
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.cache import patch_cache_control
+from django.utils.cache import patch_vary_headers
+from django.utils.http import quote_etag
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.mixins import ListModelMixin
 from rest_framework.mixins import RetrieveModelMixin
 from rest_framework.mixins import UpdateModelMixin
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
-
+{% if cookiecutter.use_async == "y" %}
+from config.async_views import AsyncViewSetMixin
+from config.authentication import LazyTokenUser
+{%- endif %}
+from config.database import NonAtomicReadsMixin
+from {{ cookiecutter.project_slug }}.users.export import CONTENT_TYPES
+from {{ cookiecutter.project_slug }}.users.export import aiter_export
+from {{ cookiecutter.project_slug }}.users.export import iter_export
 from {{ cookiecutter.project_slug }}.users.models import User
 
 from .serializers import UserSerializer
 
+# Entries are invalidated on User.post_save, so they can live for a while.
+ME_CACHE_TIMEOUT = 60 * 60
+
+
+def me_cache_key(pk: int) -> str:
+    return f"users:me:{pk}"
+
+
+def is_fresh_me_entry(entry: dict | None, request) -> bool:
+    # Hyperlinked fields embed the host, so only reuse entries built for it.
+    return entry is not None and entry["base_uri"] == request.build_absolute_uri("/")
+
+
+def build_me_entry(request, user: User) -> dict:
+    serializer = UserSerializer(user, context={"request": request})
+    data = dict(serializer.data)
+    digest = hashlib.sha256(
+        json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode(),
+    ).hexdigest()
+    return {
+        "base_uri": request.build_absolute_uri("/"),
+        "data": data,
+        "etag": quote_etag(digest),
+    }
+
+
+def me_response(request, entry: dict):
+    # No Last-Modified: User has no modification time, and the time the
+    # entry was built would change on every rebuild. The ETag only changes
+    # with the representation.
+    response = get_conditional_response(
+        request,
+        etag=entry["etag"],
+    ) or Response(status=status.HTTP_200_OK, data=entry["data"])
+    response.headers["ETag"] = entry["etag"]
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ["Authorization"])
+    return response
+
 
-class UserViewSet(RetrieveModelMixin, ListModelMixin, UpdateModelMixin, GenericViewSet):
+class UserViewSet(
+    NonAtomicReadsMixin,
+    RetrieveModelMixin,
+    ListModelMixin,
+    UpdateModelMixin,
+    GenericViewSet,
+):
     serializer_class = UserSerializer
     queryset = User.objects.all()
     {%- if cookiecutter.username_type == "email" %}
@@ -26,5 +93,74 @@ class UserViewSet(RetrieveModelMixin, ListModelMixin, UpdateModelMixin, GenericV
 
     @action(detail=False)
     def me(self, request):
-        serializer = UserSerializer(request.user, context={"request": request})
-        return Response(status=status.HTTP_200_OK, data=serializer.data)
+        """Return the current user, answering conditional GETs with a 304.
+
+        The representation is cached per user together with its ETag, so
+        repeat calls cost a single cache read.
+        """
+        key = me_cache_key(request.user.pk)
+        entry = cache.get(key)
+        if not is_fresh_me_entry(entry, request):
+            entry = build_me_entry(request, request.user)
+            cache.set(key, entry, ME_CACHE_TIMEOUT)
+        return me_response(request, entry)
+
+    @action(detail=False, permission_classes=[IsAdminUser])
+    def export(self, request):
+        """Stream every user as NDJSON (default) or CSV (``?output=csv``)."""
+        fmt = request.query_params.get("output", "ndjson")
+        if fmt not in CONTENT_TYPES:
+            choices = ", ".join(CONTENT_TYPES)
+            raise ValidationError({"output": f"Choose one of {choices}."})
+        if isinstance(request._request, ASGIRequest):  # noqa: SLF001
+            content = aiter_export(fmt)
+        else:
+            content = iter_export(fmt)
+        response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[fmt])
+        response["Content-Disposition"] = f'attachment; filename="users.{fmt}"'
+        return response
+{%- if cookiecutter.use_async == "y" %}
+
+
+class AsyncUserViewSet(AsyncViewSetMixin, UserViewSet):
+    """``UserViewSet`` with its read and update actions running on the event loop."""
+
+    async def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is None:
+            users = [user async for user in queryset.aiterator()]
+            return Response(self.get_serializer(users, many=True).data)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    async def retrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
+
+    async def update(self, request, *args, **kwargs):
+        partial = kwargs.pop("partial", False)
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        # Field validators may query the database (unique checks).
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        # Same save path as the sync viewset: perform_update, serializer.save().
+        await sync_to_async(self.perform_update)(serializer)
+        return Response(serializer.data)
+
+    async def partial_update(self, request, *args, **kwargs):
+        kwargs["partial"] = True
+        return await self.update(request, *args, **kwargs)
+
+    @action(detail=False)
+    async def me(self, request):
+        key = me_cache_key(request.user.pk)
+        entry = await cache.aget(key)
+        if not is_fresh_me_entry(entry, request):
+            user = request.user
+            if isinstance(user, LazyTokenUser):
+                user = await user.ainstance()
+            entry = build_me_entry(request, user)
+            await cache.aset(key, entry, ME_CACHE_TIMEOUT)
+        return me_response(request, entry)
+{%- endif %}
@@ -1,5 +1,3 @@
-import contextlib
-
 from django.apps import AppConfig
 from django.utils.translation import gettext_lazy as _
 
@@ -9,5 +7,6 @@ class UsersConfig(AppConfig):
     verbose_name = _("Users")
 
     def ready(self):
-        with contextlib.suppress(ImportError):
-            import {{ cookiecutter.project_slug }}.users.signals  # noqa: F401, PLC0415
+        # The signals keep cached /users/me/ payloads fresh; do not hide
+        # import errors.
+        import {{ cookiecutter.project_slug }}.users.signals  # noqa: F401, PLC0415
@@ -0,0 +1,68 @@
+"""
+Buffered ``last_login`` updates.
+
+Issuing a JWT records the login time in a Redis hash instead of updating the
+user row inside the request. ``flush_last_login`` later writes the whole
+buffer with a single ``UPDATE ... FROM (VALUES ...)`` per chunk. The buffer
+lives in Redis, so it survives web and worker restarts; a batch is only
+dropped once its update has committed.
+"""
+
+from datetime import UTC
+from datetime import datetime
+from functools import cache
+
+import redis
+from django.conf import settings
+from django.contrib.auth.models import update_last_login
+from django.db import connection
+from django.db import transaction
+
+from .models import User
+
+PENDING_KEY = "users:last_login:pending"
+PROCESSING_KEY = "users:last_login:processing"
+FLUSH_CHUNK_SIZE = 1000
+
+
+@cache
+def get_redis() -> redis.Redis:
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def record_last_login(user: User) -> None:
+    """Buffer the login time of ``user``, falling back to a direct update."""
+    try:
+        get_redis().hset(PENDING_KEY, str(user.pk), str(datetime.now(UTC).timestamp()))
+    except redis.RedisError:
+        update_last_login(None, user)
+
+
+def flush_last_login() -> int:
+    """Write buffered login times to the database and return how many were written."""
+    client = get_redis()
+    # A batch left over by an interrupted flush is retried before taking a new one.
+    if not client.exists(PROCESSING_KEY):
+        try:
+            client.rename(PENDING_KEY, PROCESSING_KEY)
+        except redis.ResponseError:
+            return 0  # Nothing buffered.
+
+    rows = [
+        (int(pk), datetime.fromtimestamp(float(timestamp), tz=UTC))
+        for pk, timestamp in client.hgetall(PROCESSING_KEY).items()
+    ]
+    table = connection.ops.quote_name(User._meta.db_table)  # noqa: SLF001
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(rows), FLUSH_CHUNK_SIZE):
+            chunk = rows[start : start + FLUSH_CHUNK_SIZE]
+            values = ", ".join(["(%s::bigint, %s::timestamptz)"] * len(chunk))
+            cursor.execute(
+                f"UPDATE {table} AS u SET last_login = v.last_login "  # noqa: S608
+                f"FROM (VALUES {values}) AS v(id, last_login) "
+                "WHERE u.id = v.id "
+                "AND (u.last_login IS NULL OR u.last_login < v.last_login)",
+                [param for row in chunk for param in row],
+            )
+    client.delete(PROCESSING_KEY)
+    return len(rows)
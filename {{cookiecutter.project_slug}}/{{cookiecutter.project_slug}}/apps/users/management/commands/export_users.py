@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from {{ cookiecutter.project_slug }}.users.export import CONTENT_TYPES
+from {{ cookiecutter.project_slug }}.users.export import DEFAULT_CHUNK_SIZE
+from {{ cookiecutter.project_slug }}.users.export import iter_export
+
+
+class Command(BaseCommand):
+    help = "Stream all users to a file or stdout as NDJSON or CSV, in constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="Destination file, or '-' for stdout (default).",
+        )
+        parser.add_argument("--format", choices=list(CONTENT_TYPES), default="ndjson")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        lines = iter_export(options["format"], chunk_size=options["chunk_size"])
+        if options["output"] == "-":
+            sys.stdout.writelines(lines)
+            return
+        with Path(options["output"]).open("w", newline="") as output:
+            output.writelines(lines)
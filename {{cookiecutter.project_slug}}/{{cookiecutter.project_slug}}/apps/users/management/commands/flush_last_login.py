@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from {{ cookiecutter.project_slug }}.users.last_login import flush_last_login
+
+
+class Command(BaseCommand):
+    help = "Write buffered last_login timestamps to the database."
+
+    def handle(self, *args, **options):
+        count = flush_last_login()
+        self.stdout.write(self.style.SUCCESS(f"Flushed {count} last_login timestamps."))
@@ -0,0 +1,192 @@
+import contextlib
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db import transaction
+from django.utils import timezone
+
+from {{ cookiecutter.project_slug }}.users.models import User
+
+# Columns written for every imported user, in COPY order.
+COLUMNS = [
+    {%- if cookiecutter.username_type == "username" %}
+    "username",
+    {%- endif %}
+    "email",
+    "name",
+    "password",
+    "is_staff",
+    "is_superuser",
+    "is_active",
+    "date_joined",
+]
+
+
+def _init_worker():
+    # Needed on platforms where worker processes are spawned rather than forked.
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import users from a CSV or JSON Lines file "
+        "({% if cookiecutter.username_type == 'username' %}username, {% endif %}email, name, password). "
+        "Rows end up exactly as UserManager.create_user would save them; "
+        "rows clashing with an existing user are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Input file, or '-' for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="Input format. Defaults to the file extension.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Rows hashed and copied per batch.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Password hashing processes. Defaults to the number of CPUs.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"]
+        if fmt is None:
+            fmt = "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+        try:
+            with contextlib.ExitStack() as stack:
+                stream = (
+                    sys.stdin
+                    if path == "-"
+                    else stack.enter_context(Path(path).open(newline=""))
+                )
+                self.import_rows(self.read_rows(stream, fmt), options)
+        except OSError as exc:
+            raise CommandError(exc) from exc
+
+    def import_rows(self, rows, options):
+        chunk_size = options["chunk_size"]
+        workers = options["workers"] or os.cpu_count() or 1
+        table = connection.ops.quote_name(User._meta.db_table)  # noqa: SLF001
+        columns = ", ".join(connection.ops.quote_name(column) for column in COLUMNS)
+        self.stats = {"read": 0, "invalid": 0, "created": 0}
+        started = time.monotonic()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS user_import AS "  # noqa: S608
+                f"SELECT {columns} FROM {table} WITH NO DATA",
+            )
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+            ) as pool:
+                # Hash the next chunk in the pool while the current one is copied.
+                pending = None
+                while chunk := list(islice(rows, chunk_size)):
+                    chunk = self.clean(chunk)
+                    hashes = pool.map(
+                        make_password,
+                        [row["password"] or None for row in chunk],
+                        chunksize=max(1, len(chunk) // (4 * workers)),
+                    )
+                    if pending:
+                        self.copy(cursor, table, columns, *pending)
+                        self.report(started)
+                    pending = (chunk, hashes)
+                if pending:
+                    self.copy(cursor, table, columns, *pending)
+            cursor.execute("DROP TABLE IF EXISTS user_import")
+
+        self.report(started)
+        skipped = self.stats["read"] - self.stats["invalid"] - self.stats["created"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {self.stats['created']} users "
+                f"({skipped} already existed, {self.stats['invalid']} invalid).",
+            ),
+        )
+
+    def read_rows(self, stream, fmt: str):
+        if fmt == "csv":
+            return iter(csv.DictReader(stream))
+        return (json.loads(line) for line in stream if line.strip())
+
+    def clean(self, chunk: list[dict]) -> list[dict]:
+        """Normalize rows like ``UserManager._create_user``; drop invalid ones."""
+        self.stats["read"] += len(chunk)
+        cleaned = []
+        for row in chunk:
+            email = User.objects.normalize_email(row.get("email") or "")
+            {%- if cookiecutter.username_type == "username" %}
+            username = User.normalize_username(row.get("username") or "")
+            if not username:
+                self.stats["invalid"] += 1
+                continue
+            {%- else %}
+            if not email:
+                self.stats["invalid"] += 1
+                continue
+            {%- endif %}
+            cleaned.append(
+                {
+                    {%- if cookiecutter.username_type == "username" %}
+                    "username": username,
+                    {%- endif %}
+                    "email": email,
+                    "name": row.get("name") or "",
+                    "password": row.get("password") or "",
+                },
+            )
+        return cleaned
+
+    def copy(self, cursor, table: str, columns: str, chunk: list[dict], hashes):
+        date_joined = timezone.now()
+        with transaction.atomic():
+            cursor.execute("TRUNCATE user_import")
+            with cursor.copy(f"COPY user_import ({columns}) FROM STDIN") as copy:
+                for row, password in zip(chunk, hashes, strict=True):
+                    copy.write_row(
+                        (
+                            {%- if cookiecutter.username_type == "username" %}
+                            row["username"],
+                            {%- endif %}
+                            row["email"],
+                            row["name"],
+                            password,
+                            False,
+                            False,
+                            True,
+                            date_joined,
+                        ),
+                    )
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) "  # noqa: S608
+                f"SELECT {columns} FROM user_import ON CONFLICT DO NOTHING",
+            )
+            self.stats["created"] += cursor.rowcount
+
+    def report(self, started: float):
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stderr.write(
+            f"{self.stats['read']} rows read, {self.stats['created']} created "
+            f"({self.stats['read'] / elapsed:.0f} rows/s)",
+        )
@@ -0,0 +1,43 @@
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from config.staticfiles import sync_static
+
+
+class Command(BaseCommand):
+    help = "Upload the static files changed since the last sync to the static storage."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=16,
+            help="Number of concurrent uploads (default 16).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Upload every file, ignoring the stored manifest.",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Upload nothing; exit with status 1 if files changed.",
+        )
+
+    def handle(self, *args, **options):
+        changed = sync_static(
+            staticfiles_storage,
+            workers=options["workers"],
+            force=options["force"],
+            dry_run=options["check"],
+        )
+        if not changed:
+            self.stdout.write("Static files are up to date.")
+        elif options["check"]:
+            msg = f"{len(changed)} static files changed since the last sync."
+            raise CommandError(msg)
+        else:
+            msg = f"Uploaded {len(changed)} static files."
+            self.stdout.write(self.style.SUCCESS(msg))
@@ -3,10 +3,13 @@ from typing import ClassVar
 
 {% endif -%}
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.indexes import OpClass
 from django.db.models import CharField
 {%- if cookiecutter.username_type == "email" %}
 from django.db.models import EmailField
 {%- endif %}
+from django.db.models.functions import Upper
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 {%- if cookiecutter.username_type == "email" %}
@@ -34,6 +37,25 @@ class User(AbstractUser):
     objects: ClassVar[UserManager] = UserManager()
     {%- endif %}
 
+    class Meta(AbstractUser.Meta):
+        # Trigram indexes on UPPER(field) serve the admin's icontains search.
+        indexes = [
+            {%- if cookiecutter.username_type == "username" %}
+            GinIndex(
+                OpClass(Upper("username"), name="gin_trgm_ops"),
+                name="users_user_username_trgm",
+            ),
+            {%- endif %}
+            GinIndex(
+                OpClass(Upper("email"), name="gin_trgm_ops"),
+                name="users_user_email_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="users_user_name_trgm",
+            ),
+        ]
+
     def get_absolute_url(self) -> str:
         """Get URL for user's detail view.
 
@@ -0,0 +1,30 @@
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from config.authentication import revoke_user_tokens
+
+from .api.views import me_cache_key
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def invalidate_me_cache(sender, instance: User, **kwargs):
+    # Readers may re-cache the old row until the transaction commits.
+    transaction.on_commit(partial(cache.delete, me_cache_key(instance.pk)))
+
+
+@receiver(post_save, sender=User)
+def revoke_inactive_user_tokens(sender, instance: User, **kwargs):
+    # Safe API requests trust the access token and never read is_active.
+    if not instance.is_active:
+        transaction.on_commit(partial(revoke_user_tokens, instance.pk))
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(sender, instance: User, **kwargs):
+    transaction.on_commit(partial(revoke_user_tokens, instance.pk))
@@ -1,9 +1,16 @@
 from celery import shared_task
 
+from . import last_login
 from .models import User
 
 
-@shared_task()
+@shared_task(ignore_result=False)
 def get_users_count():
     """A pointless Celery task to demonstrate usage."""
     return User.objects.count()
+
+
+@shared_task()
+def flush_last_login():
+    """Write buffered last_login timestamps; scheduled in CELERY_BEAT_SCHEDULE."""
+    return last_login.flush_last_login()
@@ -0,0 +1,136 @@
+import json
+
+import pytest
+{%- if cookiecutter.use_async == "y" %}
+from asgiref.sync import async_to_sync
+{%- endif %}
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+from rest_framework.test import force_authenticate
+{% if cookiecutter.use_async == "y" %}
+from {{ cookiecutter.project_slug }}.users.api.views import AsyncUserViewSet
+{%- endif %}
+from {{ cookiecutter.project_slug }}.users.api.views import UserViewSet
+from {{ cookiecutter.project_slug }}.users.api.views import me_cache_key
+from {{ cookiecutter.project_slug }}.users.export import EXPORT_FIELDS
+from {{ cookiecutter.project_slug }}.users.models import User
+from {{ cookiecutter.project_slug }}.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TestUserViewSet:
+    @pytest.fixture
+    def api_rf(self) -> APIRequestFactory:
+        return APIRequestFactory()
+
+    def get_me(self, api_rf: APIRequestFactory, user: User, **extra):
+        view = UserViewSet()
+        request = api_rf.get("/fake-url/", **extra)
+        request.user = user
+        view.request = request
+        return view.me(request)
+
+    def test_me(self, user: User, api_rf: APIRequestFactory):
+        response = self.get_me(api_rf, user)
+
+        assert response.data == {
+            {%- if cookiecutter.username_type == "email" %}
+            "url": f"http://testserver/api/users/{user.pk}/",
+            {%- else %}
+            "username": user.username,
+            "url": f"http://testserver/api/users/{user.username}/",
+            {%- endif %}
+            "name": user.name,
+        }
+        assert response["ETag"] == cache.get(me_cache_key(user.pk))["etag"]
+        assert "Last-Modified" not in response
+
+    def test_me_not_modified(self, user: User, api_rf: APIRequestFactory):
+        etag = self.get_me(api_rf, user)["ETag"]
+
+        response = self.get_me(api_rf, user, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+
+    def test_me_served_from_cache(self, user: User, api_rf: APIRequestFactory):
+        self.get_me(api_rf, user)
+        user.name = "Not saved"
+
+        response = self.get_me(api_rf, user)
+
+        assert response.data["name"] != "Not saved"
+
+    def test_save_invalidates_me(
+        self,
+        user: User,
+        api_rf: APIRequestFactory,
+        django_capture_on_commit_callbacks,
+    ):
+        etag = self.get_me(api_rf, user)["ETag"]
+        user.name = "Renamed"
+        with django_capture_on_commit_callbacks(execute=True):
+            user.save()
+
+        response = self.get_me(api_rf, user, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["name"] == "Renamed"
+        assert response["ETag"] != etag
+
+    def get_export(self, api_rf: APIRequestFactory, user: User, query: str = ""):
+        view = UserViewSet.as_view({"get": "export"})
+        request = api_rf.get(f"/api/users/export/{query}")
+        force_authenticate(request, user=user)
+        return view(request)
+
+    def test_export(self, api_rf: APIRequestFactory):
+        admin = UserFactory(is_staff=True)
+
+        response = self.get_export(api_rf, admin, "?output=csv")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "text/csv"
+        assert response["Content-Disposition"] == 'attachment; filename="users.csv"'
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert lines[0] == ",".join(EXPORT_FIELDS)
+        assert lines[1].startswith(f"{admin.pk},")
+
+    def test_export_defaults_to_ndjson(self, api_rf: APIRequestFactory):
+        admin = UserFactory(is_staff=True)
+
+        response = self.get_export(api_rf, admin)
+
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert json.loads(b"".join(response.streaming_content))["id"] == admin.pk
+
+    def test_export_requires_admin(self, user: User, api_rf: APIRequestFactory):
+        response = self.get_export(api_rf, user)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_export_rejects_unknown_output(self, api_rf: APIRequestFactory):
+        response = self.get_export(api_rf, UserFactory(is_staff=True), "?output=xml")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "output" in response.data
+{%- if cookiecutter.use_async == "y" %}
+
+
+class TestAsyncUserViewSet:
+    @pytest.fixture
+    def api_rf(self) -> APIRequestFactory:
+        return APIRequestFactory()
+
+    def test_list(self, user: User, api_rf: APIRequestFactory):
+        view = AsyncUserViewSet.as_view({"get": "list"})
+        request = api_rf.get("/api/users/")
+        force_authenticate(request, user=user)
+
+        response = async_to_sync(view)(request)
+
+        assert response.status_code == status.HTTP_200_OK
+        body = json.loads(response.content)
+        assert [row["name"] for row in body["results"]] == [user.name]
+        assert body["next"] is None
+{%- endif %}
@@ -0,0 +1,146 @@
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
+
+from config.authentication import LazyTokenUser
+from config.authentication import LazyUserJWTAuthentication
+from config.authentication import RefreshToken
+from config.authentication import revoke_user_tokens
+from config.authentication import revoked_user_key
+from {{ cookiecutter.project_slug }}.users.models import User
+from {{ cookiecutter.project_slug }}.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TestRefreshToken:
+    def test_for_user_adds_user_claims(self):
+        user = UserFactory(is_staff=True)
+        token = RefreshToken.for_user(user)
+        assert token["is_staff"] is True
+        assert token["is_superuser"] is False
+
+    def test_blacklisted_token_fails_verification(self, user: User):
+        token = RefreshToken.for_user(user)
+        token.verify()
+        token.blacklist()
+        with pytest.raises(TokenError):
+            RefreshToken(str(token))
+
+    def test_blacklist_only_covers_its_token(self, user: User):
+        RefreshToken.for_user(user).blacklist()
+        RefreshToken.for_user(user).verify()
+
+    def test_blacklist_entry_expires_with_token(self, user: User):
+        token = RefreshToken.for_user(user)
+        token.blacklist()
+        assert cache.get(token.blacklist_key()) == 1
+
+        expired = RefreshToken.for_user(user)
+        expired.set_exp(lifetime=-timedelta(seconds=1))
+        expired.blacklist()
+        assert cache.get(expired.blacklist_key()) is None
+
+
+class TestLazyTokenUser:
+    def test_claims_do_not_load_user(self, django_assert_num_queries):
+        user = UserFactory(is_staff=True)
+        token_user = LazyTokenUser(RefreshToken.for_user(user).access_token)
+        with django_assert_num_queries(0):
+            assert token_user.pk == user.pk
+            assert token_user.is_staff is True
+            assert token_user.is_superuser is False
+
+    def test_other_attributes_load_user_once(
+        self,
+        user: User,
+        django_assert_num_queries,
+    ):
+        token_user = LazyTokenUser(RefreshToken.for_user(user).access_token)
+        with django_assert_num_queries(1):
+            assert token_user.email == user.email
+            assert token_user.name == user.name
+            assert token_user.instance == user
+
+    def test_loaded_user_decides_is_active(self, user: User):
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        token_user = LazyTokenUser(RefreshToken.for_user(user).access_token)
+        assert token_user.is_active is True
+        assert token_user.instance.is_active is False
+        assert token_user.is_active is False
+
+    def test_tokens_issued_after_revocation_are_active(self, user: User):
+        token = RefreshToken.for_user(user).access_token
+        cache.set(revoked_user_key(user.pk), token["iat"] - 1)
+        assert LazyTokenUser(token).is_active is True
+
+    def test_username_claim(self, user: User, django_assert_num_queries):
+        token = RefreshToken.for_user(user).access_token
+        token["username"] = "from-token"
+        token_user = LazyTokenUser(token)
+        with django_assert_num_queries(0):
+            assert token_user.username == "from-token"
+    {%- if cookiecutter.username_type == "username" %}
+
+    def test_username_falls_back_to_user(self, user: User):
+        token_user = LazyTokenUser(RefreshToken.for_user(user).access_token)
+        assert token_user.username == user.username
+        assert token_user.get_username() == user.username
+    {%- endif %}
+
+
+class TestLazyUserJWTAuthentication:
+    @pytest.mark.parametrize(
+        ("method", "user_class"),
+        [("get", LazyTokenUser), ("post", User)],
+    )
+    def test_safe_methods_get_lazy_user(self, user: User, rf, method, user_class):
+        token = RefreshToken.for_user(user).access_token
+        request = getattr(rf, method)("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        authenticated, _ = LazyUserJWTAuthentication().authenticate(request)
+        assert isinstance(authenticated, user_class)
+        assert authenticated.pk == user.pk
+
+    def test_rejects_deactivated_user(
+        self,
+        user: User,
+        rf,
+        django_capture_on_commit_callbacks,
+    ):
+        token = RefreshToken.for_user(user).access_token
+        user.is_active = False
+        with django_capture_on_commit_callbacks(execute=True):
+            user.save()
+        request = rf.get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        with pytest.raises(AuthenticationFailed):
+            LazyUserJWTAuthentication().authenticate(request)
+
+    def test_rejects_deleted_user(
+        self,
+        user: User,
+        rf,
+        django_capture_on_commit_callbacks,
+    ):
+        token = RefreshToken.for_user(user).access_token
+        with django_capture_on_commit_callbacks(execute=True):
+            user.delete()
+        request = rf.get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        with pytest.raises(AuthenticationFailed):
+            LazyUserJWTAuthentication().authenticate(request)
+
+    def test_aauthenticate(self, user: User, rf):
+        token = RefreshToken.for_user(user).access_token
+        request = rf.get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        authenticate = async_to_sync(LazyUserJWTAuthentication().aauthenticate)
+
+        authenticated, _ = authenticate(request)
+        assert isinstance(authenticated, LazyTokenUser)
+        assert authenticated.pk == user.pk
+
+        revoke_user_tokens(user.pk)
+        with pytest.raises(AuthenticationFailed):
+            authenticate(request)
@@ -0,0 +1,87 @@
+import pytest
+import redis
+
+from config import batching
+from config.batching import BatchTask
+from config.batching import batched_task
+
+
+@batched_task(max_size=2, max_wait=5.0)
+def double(items):
+    return [ValueError(item) if item < 0 else item * 2 for item in items]
+
+
+@batched_task()
+def ignore(items):
+    return None
+
+
+@pytest.fixture
+def scheduled(monkeypatch) -> list[dict]:
+    """Record the runs tasks schedule instead of sending them to the broker."""
+    scheduled = []
+
+    def apply_async(self, args=None, kwargs=None, **options):
+        scheduled.append({"args": args, **options})
+
+    monkeypatch.setattr(BatchTask, "apply_async", apply_async)
+    return scheduled
+
+
+@pytest.fixture
+def redis_client() -> redis.Redis:
+    client = batching.get_redis()
+    try:
+        client.ping()
+    except redis.ConnectionError:
+        pytest.skip("Redis is not running at REDIS_URL")
+    client.delete(double.buffer_key)
+    yield client
+    client.delete(double.buffer_key)
+
+
+def test_reports_result_per_item():
+    assert double([1, -1]) == [
+        {"item": 1, "result": 2},
+        {"item": -1, "error": "ValueError(-1)"},
+    ]
+
+
+def test_no_results():
+    assert ignore([1, 2]) == [
+        {"item": 1, "result": None},
+        {"item": 2, "result": None},
+    ]
+
+
+def test_default_queue():
+    assert double.queue == "bulk"
+
+
+def test_delay_many_splits_items(scheduled):
+    double.delay_many([1, 2, 3])
+    assert [run["args"] for run in scheduled] == [([1, 2],), ([3],)]
+
+
+def test_add_schedules_runs(redis_client, scheduled):
+    double.add(1)
+    assert scheduled == [{"args": None, "countdown": 5.0}]
+
+    double.add(2)
+    assert scheduled[1:] == [{"args": None}]
+
+    double.add(3, 4, 5)
+    assert scheduled[2:] == [{"args": None}]
+    assert redis_client.llen(double.buffer_key) == 5  # noqa: PLR2004
+
+
+def test_runs_buffered_items(redis_client, scheduled):
+    double.add(1, 2, 3)
+    scheduled.clear()
+
+    assert [entry["item"] for entry in double()] == [1, 2]
+    # One item is left, so another run picks it up.
+    assert scheduled == [{"args": None, "countdown": 5.0}]
+
+    assert [entry["item"] for entry in double()] == [3]
+    assert double() == []
@@ -0,0 +1,26 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from config.celery_app import QUEUE_PROFILES
+from config.celery_app import app
+from config.celery_app import worker_profile
+
+
+def test_worker_profile():
+    assert worker_profile("bulk") is QUEUE_PROFILES["bulk"]
+
+
+def test_unknown_worker_queue():
+    with pytest.raises(ImproperlyConfigured, match="use one of fast, default, bulk"):
+        worker_profile("buik")
+
+
+@pytest.mark.parametrize(
+    ("task_name", "queue"),
+    [
+        ("{{ cookiecutter.project_slug }}.users.tasks.get_users_count", "fast"),
+        ("{{ cookiecutter.project_slug }}.users.tasks.flush_last_login", "default"),
+    ],
+)
+def test_task_routes(task_name, queue):
+    assert app.amqp.router.route({}, task_name)["queue"].name == queue
@@ -0,0 +1,92 @@
+import pytest
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+
+from config import db_router
+from config.db_router import REPLICA_DB_ALIAS
+from config.db_router import STICKY_COOKIE_NAME
+from config.db_router import PrimaryReplicaRouter
+from config.db_router import ReplicaRoutingMiddleware
+from {{ cookiecutter.project_slug }}.users.models import User
+
+# The replica alias is only added to settings; nothing connects to it.
+pytestmark = pytest.mark.filterwarnings("ignore:Overriding setting DATABASES")
+
+
+@pytest.fixture
+def replica(settings, monkeypatch) -> None:
+    settings.DATABASES = {
+        **settings.DATABASES,
+        REPLICA_DB_ALIAS: settings.DATABASES[DEFAULT_DB_ALIAS],
+    }
+    monkeypatch.setattr(db_router, "replica_lag", lambda: 0.0)
+
+
+def serve(request, *, write=False):
+    """Run ``request`` through the middleware; return its read alias and response."""
+    router = PrimaryReplicaRouter()
+    routed = {}
+
+    def view(request):
+        if write:
+            router.db_for_write(User)
+        routed["read"] = router.db_for_read(User)
+        return HttpResponse()
+
+    response = ReplicaRoutingMiddleware(view)(request)
+    return routed["read"], response
+
+
+class TestPrimaryReplicaRouter:
+    def test_outside_requests_use_primary(self):
+        router = PrimaryReplicaRouter()
+        assert router.db_for_read(User) == DEFAULT_DB_ALIAS
+        assert router.db_for_write(User) == DEFAULT_DB_ALIAS
+
+    def test_only_primary_is_migrated(self):
+        router = PrimaryReplicaRouter()
+        assert router.allow_migrate(DEFAULT_DB_ALIAS, "users")
+        assert not router.allow_migrate(REPLICA_DB_ALIAS, "users")
+
+
+class TestReplicaRoutingMiddleware:
+    def test_unused_without_replica(self, settings):
+        settings.DATABASES = {
+            alias: config
+            for alias, config in settings.DATABASES.items()
+            if alias != REPLICA_DB_ALIAS
+        }
+        with pytest.raises(MiddlewareNotUsed):
+            ReplicaRoutingMiddleware(lambda request: HttpResponse())
+
+    def test_safe_request_reads_from_replica(self, replica, rf):
+        alias, response = serve(rf.get("/"))
+        assert alias == REPLICA_DB_ALIAS
+        assert STICKY_COOKIE_NAME not in response.cookies
+
+    def test_unsafe_request_sticks_to_primary(self, replica, rf, settings):
+        alias, response = serve(rf.post("/"))
+        assert alias == DEFAULT_DB_ALIAS
+        cookie = response.cookies[STICKY_COOKIE_NAME]
+        assert cookie["max-age"] == settings.DATABASE_REPLICA_STICKY_SECONDS
+
+    def test_write_sticks_to_primary(self, replica, rf):
+        alias, response = serve(rf.get("/"), write=True)
+        assert alias == DEFAULT_DB_ALIAS
+
+        rf.cookies[STICKY_COOKIE_NAME] = response.cookies[STICKY_COOKIE_NAME].value
+        alias, _ = serve(rf.get("/"))
+        assert alias == DEFAULT_DB_ALIAS
+
+    @pytest.mark.parametrize("primary_until", ["0", "not-a-timestamp"])
+    def test_stale_cookie_reads_from_replica(self, replica, rf, primary_until):
+        rf.cookies[STICKY_COOKIE_NAME] = primary_until
+        alias, _ = serve(rf.get("/"))
+        assert alias == REPLICA_DB_ALIAS
+
+    def test_lagging_replica_is_skipped(self, replica, rf, settings, monkeypatch):
+        lag = settings.DATABASE_REPLICA_MAX_LAG + 1
+        monkeypatch.setattr(db_router, "replica_lag", lambda: lag)
+        alias, _ = serve(rf.get("/"))
+        assert alias == DEFAULT_DB_ALIAS
@@ -0,0 +1,95 @@
+import pytest
+import redis
+from celery import shared_task
+
+from config import enqueue as enqueue_module
+from config.enqueue import PENDING_HEADER
+from config.enqueue import enqueue
+from config.enqueue import take_token
+
+KEY = "enqueue:tests.recompute:1"
+BUCKET = "ratelimit:tests.bucket"
+
+
+@shared_task(name="tests.recompute")
+def recompute(pk):
+    return pk
+
+
+class RecordingTask:
+    """Stands in for a task, recording what would be sent to the broker."""
+
+    name = "tests.recompute"
+
+    def __init__(self):
+        self.sent = []
+
+    def apply_async(self, args=None, kwargs=None, **options):
+        self.sent.append({"args": args, **options})
+        return options
+
+
+@pytest.fixture
+def redis_client() -> redis.Redis:
+    client = enqueue_module.get_redis()
+    try:
+        client.ping()
+    except redis.ConnectionError:
+        pytest.skip("Redis is not running at REDIS_URL")
+    client.delete(KEY, BUCKET)
+    yield client
+    client.delete(KEY, BUCKET)
+
+
+def test_key_deduplicates(redis_client):
+    task = RecordingTask()
+
+    assert enqueue(task, args=[1], key=1, ttl=30) is not None
+    assert enqueue(task, args=[1], key=1, ttl=30) is None
+
+    assert task.sent == [{"args": [1]}]
+    assert 0 < redis_client.ttl(KEY) <= 30  # noqa: PLR2004
+
+
+def test_coalesce_adds_pending_header(redis_client):
+    task = RecordingTask()
+
+    enqueue(task, args=[1], key=1, coalesce=True, headers={"trace": "abc"})
+
+    assert task.sent[0]["headers"] == {"trace": "abc", PENDING_HEADER: KEY}
+
+
+def test_failed_send_releases_key(redis_client):
+    class BrokenTask(RecordingTask):
+        def apply_async(self, args=None, kwargs=None, **options):
+            raise ConnectionError
+
+    with pytest.raises(ConnectionError):
+        enqueue(BrokenTask(), args=[1], key=1)
+
+    assert not redis_client.exists(KEY)
+
+
+def test_coalesced_task_releases_key_as_it_starts(redis_client, monkeypatch):
+    monkeypatch.setattr(recompute.app.conf, "task_always_eager", True)
+
+    assert enqueue(recompute, args=[1], key=1, coalesce=True).get() == 1
+
+    assert not redis_client.exists(KEY)
+    assert enqueue(recompute, args=[1], key=1, coalesce=True) is not None
+
+
+def test_rate_delays_calls_beyond_bucket(monkeypatch):
+    monkeypatch.setattr(enqueue_module, "take_token", lambda name, rate, burst: 2.5)
+    task = RecordingTask()
+
+    enqueue(task, rate="1/s")
+    enqueue(task, rate="1/s", countdown=10)
+
+    assert [call["countdown"] for call in task.sent] == [2.5, 10]
+
+
+def test_take_token(redis_client):
+    assert take_token("tests.bucket", "1/m", burst=2) == 0
+    assert take_token("tests.bucket", "1/m", burst=2) == 0
+    assert take_token("tests.bucket", "1/m", burst=2) == pytest.approx(60, abs=1)
@@ -0,0 +1,63 @@
+import csv
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+
+from {{ cookiecutter.project_slug }}.users.export import EXPORT_FIELDS
+from {{ cookiecutter.project_slug }}.users.export import aiter_export
+from {{ cookiecutter.project_slug }}.users.export import iter_export
+from {{ cookiecutter.project_slug }}.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+async def collect(fmt: str, **kwargs) -> list[str]:
+    return [line async for line in aiter_export(fmt, **kwargs)]
+
+
+def test_ndjson_export():
+    users = UserFactory.create_batch(3)
+
+    records = [json.loads(line) for line in iter_export("ndjson", chunk_size=2)]
+
+    assert [record["id"] for record in records] == [user.pk for user in users]
+    assert list(records[0]) == EXPORT_FIELDS
+    assert records[0]["email"] == users[0].email
+    assert records[0]["last_login"] is None
+
+
+def test_csv_export():
+    users = UserFactory.create_batch(2)
+
+    rows = list(csv.reader(iter_export("csv")))
+
+    assert rows[0] == EXPORT_FIELDS
+    assert [row[0] for row in rows[1:]] == [str(user.pk) for user in users]
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_async_export_matches_sync(fmt):
+    UserFactory.create_batch(3)
+    assert async_to_sync(collect)(fmt, chunk_size=2) == list(iter_export(fmt))
+
+
+def test_export_users_command(tmp_path):
+    users = UserFactory.create_batch(2)
+    output = tmp_path / "users.csv"
+
+    call_command("export_users", "--output", str(output), "--format", "csv")
+
+    with output.open(newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == EXPORT_FIELDS
+    assert len(rows) == len(users) + 1
+
+
+def test_export_users_command_to_stdout(capsys):
+    user = UserFactory()
+
+    call_command("export_users")
+
+    assert json.loads(capsys.readouterr().out)["id"] == user.pk
@@ -0,0 +1,36 @@
+import pytest
+from django.middleware.security import SecurityMiddleware
+{% if cookiecutter.use_async == 'y' %}
+from config.handlers import APIASGIHandler
+{%- endif %}
+from config.handlers import APIWSGIHandler
+from config.handlers import is_api_path
+
+
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [("/api/users/", True), ("/api/", True), ("/users/", False), ("/", False)],
+)
+def test_is_api_path(path, expected):
+    assert is_api_path(path) is expected
+
+
+@pytest.mark.parametrize(
+    "handler_class",
+    [
+        APIWSGIHandler,
+        {%- if cookiecutter.use_async == 'y' %}
+        APIASGIHandler,
+        {%- endif %}
+    ],
+)
+def test_api_handler_loads_api_middleware(settings, handler_class):
+    settings.API_MIDDLEWARE = ["django.middleware.security.SecurityMiddleware"]
+    middleware = list(settings.MIDDLEWARE)
+
+    handler = handler_class()
+
+    assert isinstance(handler._middleware_chain.__wrapped__, SecurityMiddleware)  # noqa: SLF001
+    # CsrfViewMiddleware, in MIDDLEWARE only, would add a process_view hook.
+    assert not handler._view_middleware  # noqa: SLF001
+    assert middleware == settings.MIDDLEWARE
@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import hashers
+
+from config.hashers import acheck_password
+from config.hashers import amake_password
+from {{ cookiecutter.project_slug }}.users.models import User
+from {{ cookiecutter.project_slug }}.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+PHRASE = "correct horse battery staple"
+
+
+def test_acheck_password():
+    user = UserFactory(password=PHRASE)
+    assert async_to_sync(acheck_password)(user, PHRASE) is True
+    assert async_to_sync(acheck_password)(user, "wrong " + PHRASE) is False
+
+
+def test_amake_password():
+    encoded = async_to_sync(amake_password)(PHRASE)
+    assert hashers.check_password(PHRASE, encoded)
+
+
+def test_hashes_on_the_hashing_threads(monkeypatch):
+    user = UserFactory(password=PHRASE)
+    threads = []
+    verify_password = hashers.verify_password
+
+    def record_thread(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return verify_password(*args, **kwargs)
+
+    monkeypatch.setattr(hashers, "verify_password", record_thread)
+    async_to_sync(acheck_password)(user, PHRASE)
+
+    assert threads[0] is not threading.main_thread()
+    assert threads[0].name.startswith("password-hashing")
+
+
+def test_stale_hash_is_upgraded(settings):
+    settings.PASSWORD_HASHERS = [
+        "django.contrib.auth.hashers.MD5PasswordHasher",
+        "django.contrib.auth.hashers.UnsaltedMD5PasswordHasher",
+    ]
+    user = UserFactory()
+    user.password = hashers.make_password(PHRASE, hasher="unsalted_md5")
+    user.save()
+
+    assert async_to_sync(acheck_password)(user, PHRASE) is True
+
+    user = User.objects.get(pk=user.pk)
+    assert hashers.identify_hasher(user.password).algorithm == "md5"
+    assert user.check_password(PHRASE)
@@ -0,0 +1,106 @@
+import csv
+import json
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from {{ cookiecutter.project_slug }}.users.models import User
+from {{ cookiecutter.project_slug }}.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+PHRASE = "correct horse battery staple"
+
+
+def make_row(email: str, **fields) -> dict:
+    return {
+        {%- if cookiecutter.username_type == "username" %}
+        "username": email.partition("@")[0],
+        {%- endif %}
+        "email": email,
+        "name": "Imported User",
+        "password": PHRASE,
+        **fields,
+    }
+
+
+def write_csv(path: Path, rows: list[dict]) -> Path:
+    with path.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def write_jsonl(path: Path, rows: list[dict]) -> Path:
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    return path
+
+
+def import_users(path: Path, *args) -> str:
+    stdout = StringIO()
+    call_command(
+        "import_users",
+        str(path),
+        "--workers",
+        "1",
+        *args,
+        stdout=stdout,
+        stderr=StringIO(),
+    )
+    return stdout.getvalue()
+
+
+def test_import_csv(tmp_path):
+    path = write_csv(tmp_path / "users.csv", [make_row("Ada@EXAMPLE.com")])
+
+    import_users(path)
+
+    user = User.objects.get(email="Ada@example.com")
+    assert user.name == "Imported User"
+    assert user.check_password(PHRASE)
+    assert user.is_active
+    assert not user.is_staff
+    assert not user.is_superuser
+    assert user.date_joined is not None
+
+
+def test_import_jsonl(tmp_path):
+    rows = [make_row(f"user{i}@example.com") for i in range(3)]
+    path = write_jsonl(tmp_path / "users.jsonl", rows)
+
+    import_users(path, "--chunk-size", "2")
+
+    assert User.objects.count() == len(rows)
+
+
+def test_empty_password_is_unusable(tmp_path):
+    path = write_csv(tmp_path / "users.csv", [make_row("ada@example.com", password="")])
+
+    import_users(path)
+
+    assert not User.objects.get(email="ada@example.com").has_usable_password()
+
+
+def test_skips_existing_and_invalid_rows(tmp_path):
+    taken = make_row("taken@example.com", name="New Name")
+    lookup = {User.USERNAME_FIELD: taken[User.USERNAME_FIELD]}
+    UserFactory(**lookup, name="Old Name")
+    invalid = {**make_row("invalid@example.com"), User.USERNAME_FIELD: ""}
+    path = write_jsonl(
+        tmp_path / "users.jsonl",
+        [make_row("ada@example.com"), taken, invalid],
+    )
+
+    output = import_users(path)
+
+    assert "Imported 1 users (1 already existed, 1 invalid)." in output
+    assert User.objects.get(**lookup).name == "Old Name"
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(CommandError):
+        import_users(tmp_path / "missing.csv")
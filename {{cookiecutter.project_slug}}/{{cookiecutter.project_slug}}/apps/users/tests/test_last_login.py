@@ -0,0 +1,110 @@
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+import redis
+
+from {{ cookiecutter.project_slug }}.users import last_login
+from {{ cookiecutter.project_slug }}.users.last_login import PENDING_KEY
+from {{ cookiecutter.project_slug }}.users.last_login import PROCESSING_KEY
+from {{ cookiecutter.project_slug }}.users.last_login import flush_last_login
+from {{ cookiecutter.project_slug }}.users.last_login import record_last_login
+from {{ cookiecutter.project_slug }}.users.models import User
+from {{ cookiecutter.project_slug }}.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def redis_client() -> redis.Redis:
+    client = last_login.get_redis()
+    try:
+        client.ping()
+    except redis.ConnectionError:
+        pytest.skip("Redis is not running at REDIS_URL")
+    client.delete(PENDING_KEY, PROCESSING_KEY)
+    yield client
+    client.delete(PENDING_KEY, PROCESSING_KEY)
+
+
+def buffer(client: redis.Redis, key: str, user: User, when: datetime) -> None:
+    client.hset(key, str(user.pk), str(when.timestamp()))
+
+
+def test_record_buffers_login(redis_client):
+    user = UserFactory(last_login=None)
+
+    record_last_login(user)
+
+    assert redis_client.hget(PENDING_KEY, str(user.pk)) is not None
+    user.refresh_from_db()
+    assert user.last_login is None
+
+
+def test_record_falls_back_to_update(monkeypatch):
+    class UnavailableRedis:
+        def hset(self, *args):
+            raise redis.ConnectionError
+
+    monkeypatch.setattr(last_login, "get_redis", UnavailableRedis)
+    user = UserFactory(last_login=None)
+
+    record_last_login(user)
+
+    user.refresh_from_db()
+    assert user.last_login is not None
+
+
+def test_flush_writes_buffered_logins(redis_client):
+    users = UserFactory.create_batch(3, last_login=None)
+    before = datetime.now(UTC)
+    for user in users:
+        record_last_login(user)
+
+    assert flush_last_login() == len(users)
+
+    for user in users:
+        user.refresh_from_db()
+        assert user.last_login >= before.replace(microsecond=0)
+    assert not redis_client.exists(PENDING_KEY, PROCESSING_KEY)
+
+
+def test_flush_in_chunks(redis_client, monkeypatch):
+    monkeypatch.setattr(last_login, "FLUSH_CHUNK_SIZE", 2)
+    users = UserFactory.create_batch(3, last_login=None)
+    for user in users:
+        record_last_login(user)
+
+    assert flush_last_login() == len(users)
+
+    assert not User.objects.filter(last_login=None).exists()
+
+
+def test_flush_keeps_newer_login(redis_client):
+    newer = datetime.now(UTC)
+    user = UserFactory(last_login=newer)
+    buffer(redis_client, PENDING_KEY, user, newer - timedelta(hours=1))
+
+    flush_last_login()
+
+    user.refresh_from_db()
+    assert user.last_login == newer
+
+
+def test_flush_nothing_buffered(redis_client):
+    assert flush_last_login() == 0
+
+
+def test_flush_retries_interrupted_batch(redis_client):
+    left_over, pending = UserFactory.create_batch(2, last_login=None)
+    buffer(redis_client, PROCESSING_KEY, left_over, datetime.now(UTC))
+    buffer(redis_client, PENDING_KEY, pending, datetime.now(UTC))
+
+    assert flush_last_login() == 1
+
+    left_over.refresh_from_db()
+    pending.refresh_from_db()
+    assert left_over.last_login is not None
+    assert pending.last_login is None
+    assert redis_client.hexists(PENDING_KEY, str(pending.pk))
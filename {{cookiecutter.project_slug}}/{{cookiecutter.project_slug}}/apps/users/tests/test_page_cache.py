@@ -0,0 +1,201 @@
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.utils import translation
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+from rest_framework.test import force_authenticate
+
+from config import page_cache
+from config.page_cache import PageCacheMiddleware
+from config.page_cache import PageCachePurgeView
+from config.page_cache import cache_key
+from config.page_cache import purge
+from {{ cookiecutter.project_slug }}.users.models import User
+from {{ cookiecutter.project_slug }}.users.tests.factories import UserFactory
+
+
+@pytest.fixture(autouse=True)
+def _page_cache(settings):
+    settings.PAGE_CACHE_PATHS = ["/"]
+    page_cache.page_cache().clear()
+
+
+class Views:
+    """A get_response that renders a page and counts how often it ran."""
+
+    def __init__(self, response=None):
+        self.calls = 0
+        self.response = response
+
+    def __call__(self, request):
+        self.calls += 1
+        return self.response or HttpResponse(f"render {self.calls}")
+
+
+def key_for(request) -> str:
+    return cache_key(request.path_info, translation.get_language_from_request(request))
+
+
+def stale_entry() -> dict:
+    return {
+        "fresh_until": time.time() - 1,
+        "status": status.HTTP_200_OK,
+        "headers": {"Content-Type": "text/html"},
+        "content": b"stale",
+    }
+
+
+class TestPageCacheMiddleware:
+    def test_caches_page(self, rf):
+        views = Views()
+        middleware = PageCacheMiddleware(views)
+
+        first = middleware(rf.get("/"))
+        second = middleware(rf.get("/?utm_source=ads"))
+
+        assert first["X-Page-Cache"] == "miss"
+        assert second["X-Page-Cache"] == "hit"
+        assert second.content == first.content
+        assert views.calls == 1
+
+    @pytest.mark.parametrize(
+        "request_kwargs",
+        [
+            {"path": "/other/"},
+            {"path": "/", "HTTP_AUTHORIZATION": "Bearer token"},
+        ],
+    )
+    def test_skips_other_requests(self, rf, request_kwargs):
+        views = Views()
+        middleware = PageCacheMiddleware(views)
+
+        middleware(rf.get(**request_kwargs))
+        response = middleware(rf.get(**request_kwargs))
+
+        assert "X-Page-Cache" not in response
+        assert views.calls == 2  # noqa: PLR2004
+
+    def test_skips_sessions_and_posts(self, rf, settings):
+        views = Views()
+        middleware = PageCacheMiddleware(views)
+        request = rf.get("/")
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = "session"
+
+        middleware(request)
+        middleware(rf.post("/"))
+
+        assert views.calls == 2  # noqa: PLR2004
+        assert page_cache.page_cache().get(key_for(request)) is None
+
+    def test_does_not_store_responses_setting_cookies(self, rf):
+        response = HttpResponse("page")
+        response.set_cookie("tracking", "1")
+        views = Views(response)
+        middleware = PageCacheMiddleware(views)
+
+        middleware(rf.get("/"))
+        middleware(rf.get("/"))
+
+        assert views.calls == 2  # noqa: PLR2004
+
+    def test_serves_stale_page_while_locked(self, rf):
+        views = Views()
+        middleware = PageCacheMiddleware(views)
+        request = rf.get("/")
+        key = key_for(request)
+        page_cache.page_cache().set(key, stale_entry())
+        page_cache.page_cache().add(f"{key}:lock", 1)
+
+        response = middleware(request)
+
+        assert response["X-Page-Cache"] == "stale"
+        assert response.content == b"stale"
+        assert views.calls == 0
+
+    def test_rerenders_stale_page(self, rf):
+        views = Views()
+        middleware = PageCacheMiddleware(views)
+        request = rf.get("/")
+        page_cache.page_cache().set(key_for(request), stale_entry())
+
+        response = middleware(request)
+
+        assert response["X-Page-Cache"] == "miss"
+        assert response.content == b"render 1"
+        assert page_cache.page_cache().get(key_for(request))["content"] == b"render 1"
+
+    def test_waits_for_page_being_rendered(self, rf, monkeypatch):
+        views = Views()
+        middleware = PageCacheMiddleware(views)
+        request = rf.get("/")
+        key = key_for(request)
+        page_cache.page_cache().add(f"{key}:lock", 1)
+
+        def other_request_renders(seconds):
+            entry = {**stale_entry(), "fresh_until": time.time() + 60}
+            page_cache.page_cache().set(key, entry)
+
+        monkeypatch.setattr(page_cache.time, "sleep", other_request_renders)
+        response = middleware(request)
+
+        assert response["X-Page-Cache"] == "hit"
+        assert views.calls == 0
+
+    def test_async_caches_page(self, rf):
+        views = Views()
+
+        async def get_response(request):
+            return views(request)
+
+        middleware = PageCacheMiddleware(get_response)
+
+        first = async_to_sync(middleware)(rf.get("/"))
+        second = async_to_sync(middleware)(rf.get("/"))
+
+        assert first["X-Page-Cache"] == "miss"
+        assert second["X-Page-Cache"] == "hit"
+        assert views.calls == 1
+
+    def test_not_used_without_paths(self, settings):
+        settings.PAGE_CACHE_PATHS = []
+        with pytest.raises(MiddlewareNotUsed):
+            PageCacheMiddleware(Views())
+
+
+def test_purge(rf):
+    middleware = PageCacheMiddleware(Views())
+    middleware(rf.get("/"))
+
+    purge()
+
+    assert middleware(rf.get("/"))["X-Page-Cache"] == "miss"
+
+
+@pytest.mark.django_db
+class TestPageCachePurgeView:
+    def post(self, user: User, data: dict):
+        request = APIRequestFactory().post(
+            "/api/page-cache/purge/",
+            data,
+            format="json",
+        )
+        force_authenticate(request, user=user)
+        return PageCachePurgeView.as_view()(request)
+
+    def test_purges_paths(self, rf):
+        middleware = PageCacheMiddleware(Views())
+        middleware(rf.get("/"))
+
+        response = self.post(UserFactory(is_staff=True), {"paths": ["/"]})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {"purged": ["/"]}
+        assert middleware(rf.get("/"))["X-Page-Cache"] == "miss"
+
+    def test_requires_admin(self, user: User):
+        response = self.post(user, {})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,113 @@
+import pytest
+from asgiref.sync import async_to_sync
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from config import pagination
+from config.pagination import CursorPagination
+from config.pagination import EstimatedCountPaginator
+from config.pagination import estimated_row_count
+from {{ cookiecutter.project_slug }}.users.models import User
+from {{ cookiecutter.project_slug }}.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+LARGE_TABLE_ROWS = 1_000_000
+
+
+def paginate(url: str) -> tuple[list[User], CursorPagination]:
+    paginator = CursorPagination()
+    request = Request(APIRequestFactory().get(url))
+    return paginator.paginate_queryset(User.objects.all(), request), paginator
+
+
+def apaginate(url: str) -> tuple[list[User], CursorPagination]:
+    paginator = CursorPagination()
+    request = Request(APIRequestFactory().get(url))
+    paginate_queryset = async_to_sync(paginator.apaginate_queryset)
+    return paginate_queryset(User.objects.all(), request), paginator
+
+
+class TestCursorPagination:
+    def test_pages_newest_first(self):
+        users = UserFactory.create_batch(5)
+
+        page, paginator = paginate("/users/?page_size=2")
+        assert page == [users[4], users[3]]
+        assert paginator.get_previous_link() is None
+
+        page, paginator = paginate(paginator.get_next_link())
+        assert page == [users[2], users[1]]
+        assert paginator.get_previous_link() is not None
+
+        page, paginator = paginate(paginator.get_next_link())
+        assert page == [users[0]]
+        assert paginator.get_next_link() is None
+
+    def test_previous_page(self):
+        users = UserFactory.create_batch(3)
+        _, paginator = paginate("/users/?page_size=2")
+        _, paginator = paginate(paginator.get_next_link())
+
+        page, _ = paginate(paginator.get_previous_link())
+
+        assert page == [users[2], users[1]]
+
+    def test_page_size_is_capped(self, monkeypatch):
+        monkeypatch.setattr(CursorPagination, "max_page_size", 2)
+        UserFactory.create_batch(3)
+
+        page, _ = paginate("/users/?page_size=100")
+
+        assert len(page) == CursorPagination.max_page_size
+
+    def test_async_pages_match_sync_pages(self):
+        UserFactory.create_batch(5)
+        page, paginator = paginate("/users/?page_size=2")
+        apage, apaginator = apaginate("/users/?page_size=2")
+        assert apage == page
+        assert apaginator.get_next_link() == paginator.get_next_link()
+
+        next_link = paginator.get_next_link()
+        page, paginator = paginate(next_link)
+        apage, apaginator = apaginate(next_link)
+        assert apage == page
+        assert apaginator.get_previous_link() == paginator.get_previous_link()
+
+    def test_one_query_without_count(self, django_assert_num_queries):
+        UserFactory.create_batch(3)
+        with django_assert_num_queries(1):
+            paginate("/users/")
+
+
+class TestEstimatedCountPaginator:
+    @pytest.fixture
+    def estimate(self, monkeypatch):
+        def set_estimate(rows: int) -> None:
+            monkeypatch.setattr(
+                pagination,
+                "estimated_row_count",
+                lambda model, using="default": rows,
+            )
+
+        return set_estimate
+
+    def test_large_table_uses_estimate(self, estimate):
+        UserFactory.create_batch(2)
+        estimate(LARGE_TABLE_ROWS)
+        paginator = EstimatedCountPaginator(User.objects.all(), 10)
+        assert paginator.count == LARGE_TABLE_ROWS
+
+    def test_filtered_queryset_is_counted(self, estimate):
+        users = UserFactory.create_batch(2)
+        estimate(LARGE_TABLE_ROWS)
+        queryset = User.objects.filter(is_active=True)
+        assert EstimatedCountPaginator(queryset, 10).count == len(users)
+
+    def test_small_table_is_counted(self, estimate):
+        users = UserFactory.create_batch(2)
+        estimate(5)
+        assert EstimatedCountPaginator(User.objects.all(), 10).count == len(users)
+
+    def test_estimated_row_count(self):
+        assert estimated_row_count(User) >= -1
@@ -0,0 +1,126 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+# Its static storages subclass the production backend, from django-storages.
+staticfiles = pytest.importorskip("config.staticfiles")
+
+CSS = "body { color: red; }\n" * 100
+
+
+class ObjectStorage(FileSystemStorage):
+    """A local storage with the object parameters hook of the cloud ones."""
+
+    def get_object_parameters(self, name):
+        return {}
+
+
+class PrecompressedStorage(staticfiles.PrecompressedStorageMixin, ObjectStorage):
+    pass
+
+
+@pytest.fixture
+def static_dir(tmp_path, settings):
+    static_dir = tmp_path / "static"
+    (static_dir / "css").mkdir(parents=True)
+    (static_dir / "css" / "app.css").write_text(CSS)
+    (static_dir / "logo.png").write_bytes(b"png")
+    settings.STATICFILES_DIRS = [static_dir]
+    settings.STATICFILES_FINDERS = [
+        "django.contrib.staticfiles.finders.FileSystemFinder",
+    ]
+    return static_dir
+
+
+@pytest.fixture
+def bucket(tmp_path) -> FileSystemStorage:
+    return FileSystemStorage(location=tmp_path / "bucket", allow_overwrite=True)
+
+
+def sync(bucket: FileSystemStorage, **kwargs) -> list[str]:
+    return sorted(staticfiles.sync_static(bucket, workers=2, **kwargs))
+
+
+class TestSyncStatic:
+    def test_uploads_new_files(self, static_dir, bucket):
+        assert sync(bucket) == ["css/app.css", "logo.png"]
+
+        assert bucket.exists("css/app.css")
+        with bucket.open(staticfiles.MANIFEST_NAME) as manifest:
+            assert sorted(json.load(manifest)) == ["css/app.css", "logo.png"]
+
+    def test_uploads_changed_files_only(self, static_dir, bucket):
+        sync(bucket)
+        assert sync(bucket) == []
+
+        (static_dir / "css" / "app.css").write_text(CSS + "a { color: blue; }\n")
+
+        assert sync(bucket) == ["css/app.css"]
+        with bucket.open("css/app.css") as file:
+            assert file.read().endswith(b"a { color: blue; }\n")
+
+    def test_dry_run(self, static_dir, bucket):
+        assert sync(bucket, dry_run=True) == ["css/app.css", "logo.png"]
+        assert not bucket.exists("css/app.css")
+        assert not bucket.exists(staticfiles.MANIFEST_NAME)
+
+    def test_force(self, static_dir, bucket):
+        sync(bucket)
+        assert sync(bucket, force=True) == ["css/app.css", "logo.png"]
+
+    def test_failed_upload_keeps_manifest(self, static_dir, bucket, monkeypatch):
+        def upload(storage, name, source):
+            raise ConnectionError
+
+        monkeypatch.setattr(staticfiles, "upload", upload)
+
+        with pytest.raises(ConnectionError):
+            sync(bucket)
+        assert not bucket.exists(staticfiles.MANIFEST_NAME)
+
+
+def test_syncstatic_command(static_dir, tmp_path, settings):
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+            "OPTIONS": {"location": tmp_path / "bucket", "allow_overwrite": True},
+        },
+    }
+    with pytest.raises(CommandError, match="2 static files changed"):
+        call_command("syncstatic", "--check")
+
+    stdout = StringIO()
+    call_command("syncstatic", stdout=stdout)
+    assert "Uploaded 2 static files." in stdout.getvalue()
+
+    stdout = StringIO()
+    call_command("syncstatic", "--check", stdout=stdout)
+    assert "Static files are up to date." in stdout.getvalue()
+
+
+class TestPrecompressedStorage:
+    def test_saves_variants(self, tmp_path):
+        storage = PrecompressedStorage(location=tmp_path)
+
+        storage.save("css/app.css", ContentFile(CSS.encode()))
+        storage.save("logo.png", ContentFile(b"png"))
+
+        assert storage.exists("css/app.css.br")
+        assert storage.exists("css/app.css.zst")
+        assert storage.exists("css/app.css.gz")
+        assert storage.listdir("")[1] == ["logo.png"]
+
+    def test_variant_parameters(self, tmp_path):
+        storage = PrecompressedStorage(location=tmp_path)
+
+        assert storage.get_object_parameters("css/app.css.br") == {
+            "content_type": "text/css",
+            "content_encoding": "br",
+        }
+        assert storage.get_object_parameters("logo.png") == {}
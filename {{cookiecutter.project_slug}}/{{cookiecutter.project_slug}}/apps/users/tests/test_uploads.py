@@ -0,0 +1,208 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.test import APIRequestFactory
+from rest_framework.test import force_authenticate
+
+from config import uploads
+from config.uploads import MIN_PART_SIZE
+from config.uploads import MultipartUpload
+from config.uploads import UploadViewSet
+from config.uploads import check_owner
+from config.uploads import upload_name
+from {{ cookiecutter.project_slug }}.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+MiB = 1024 * 1024
+
+
+class FakeS3Client:
+    """Records the S3 calls an upload makes instead of sending them."""
+
+    def __init__(self, fail_part=None):
+        self.calls = []
+        self.fail_part = fail_part
+        self.lock = threading.Lock()
+
+    def record(self, operation: str, params: dict) -> None:
+        with self.lock:
+            self.calls.append((operation, params))
+
+    def operations(self) -> list[str]:
+        return [operation for operation, _ in self.calls]
+
+    def create_multipart_upload(self, **params):
+        self.record("create_multipart_upload", params)
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, **params):
+        if params["PartNumber"] == self.fail_part:
+            raise ConnectionError
+        self.record("upload_part", {**params, "Body": len(params["Body"])})
+        return {"ETag": f'"etag-{params["PartNumber"]}"'}
+
+    def complete_multipart_upload(self, **params):
+        self.record("complete_multipart_upload", params)
+
+    def abort_multipart_upload(self, **params):
+        self.record("abort_multipart_upload", params)
+
+    def generate_presigned_url(self, operation, **kwargs):
+        return f"https://media.example.com/part/{kwargs['Params']['PartNumber']}"
+
+
+class FakeS3Storage:
+    bucket_name = "media-bucket"
+    location = "media"
+
+    def __init__(self, client=None):
+        self.client = client or FakeS3Client()
+        self.connection = SimpleNamespace(meta=SimpleNamespace(client=self.client))
+
+    def get_object_parameters(self, name):
+        return {}
+
+    def url(self, name):
+        return f"https://media.example.com/{name}"
+
+
+@pytest.fixture
+def storage(monkeypatch) -> FakeS3Storage:
+    storage = FakeS3Storage()
+    monkeypatch.setattr(uploads, "s3_storage", lambda: storage)
+    return storage
+
+
+def post(user: User, action: str, data: dict):
+    view = UploadViewSet.as_view({"post": action})
+    request = APIRequestFactory().post(f"/api/uploads/{action}/", data, format="json")
+    force_authenticate(request, user=user)
+    return view(request)
+
+
+def test_upload_names_are_scoped_to_user(user: User):
+    name = upload_name(user, "My Report.pdf")
+
+    assert name.startswith(f"uploads/{user.pk}/")
+    assert name.endswith("/My_Report.pdf")
+    check_owner(user, name)
+    with pytest.raises(PermissionDenied):
+        check_owner(user, f"uploads/{user.pk + 1}/abc/My_Report.pdf")
+
+
+class TestMultipartUpload:
+    def test_sends_parts_while_writing(self, settings):
+        settings.S3_UPLOAD_PART_SIZE = 0
+        storage = FakeS3Storage()
+        upload = MultipartUpload(storage, "uploads/1/a/file.bin", "video/mp4")
+
+        for _ in range(12):
+            upload.write(b"x" * MiB)
+        upload.complete()
+
+        client = storage.client
+        assert client.calls[0][1]["Key"] == "media/uploads/1/a/file.bin"
+        assert client.calls[0][1]["ContentType"] == "video/mp4"
+        sizes = sorted(
+            (params["PartNumber"], params["Body"])
+            for operation, params in client.calls
+            if operation == "upload_part"
+        )
+        assert sizes == [(1, MIN_PART_SIZE), (2, MIN_PART_SIZE), (3, 2 * MiB)]
+        operation, params = client.calls[-1]
+        assert operation == "complete_multipart_upload"
+        assert [part["ETag"] for part in params["MultipartUpload"]["Parts"]] == [
+            '"etag-1"',
+            '"etag-2"',
+            '"etag-3"',
+        ]
+
+    def test_empty_file_is_one_part(self):
+        storage = FakeS3Storage()
+        upload = MultipartUpload(storage, "uploads/1/a/empty.txt", "text/plain")
+
+        upload.complete()
+
+        assert storage.client.operations() == [
+            "create_multipart_upload",
+            "upload_part",
+            "complete_multipart_upload",
+        ]
+
+    def test_failed_part_aborts_upload(self):
+        storage = FakeS3Storage(FakeS3Client(fail_part=1))
+        upload = MultipartUpload(storage, "uploads/1/a/file.bin", "video/mp4")
+        upload.write(b"x")
+
+        with pytest.raises(ConnectionError):
+            upload.complete()
+
+        assert storage.client.operations()[-1] == "abort_multipart_upload"
+
+
+class TestUploadViewSet:
+    def test_create(self, user: User, storage: FakeS3Storage, settings):
+        settings.S3_UPLOAD_PART_SIZE = 8 * MiB
+
+        response = post(user, "create", {"filename": "clip.mp4", "size": 20 * MiB})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["name"].startswith(f"uploads/{user.pk}/")
+        assert response.data["upload_id"] == "upload-1"
+        assert response.data["part_size"] == settings.S3_UPLOAD_PART_SIZE
+        assert [part["part_number"] for part in response.data["parts"]] == [1, 2, 3]
+
+    def test_create_rejects_large_files(self, user: User, storage, settings):
+        settings.S3_UPLOAD_MAX_SIZE = MiB
+
+        response = post(user, "create", {"filename": "clip.mp4", "size": 2 * MiB})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "size" in response.data
+
+    def test_complete(self, user: User, storage: FakeS3Storage):
+        name = upload_name(user, "clip.mp4")
+        parts = [{"part_number": 2, "etag": '"b"'}, {"part_number": 1, "etag": '"a"'}]
+
+        response = post(
+            user,
+            "complete",
+            {"name": name, "upload_id": "upload-1", "parts": parts},
+        )
+
+        assert response.data == {"name": name, "url": storage.url(name)}
+        operation, params = storage.client.calls[-1]
+        assert operation == "complete_multipart_upload"
+        assert params["MultipartUpload"]["Parts"] == [
+            {"PartNumber": 1, "ETag": '"a"'},
+            {"PartNumber": 2, "ETag": '"b"'},
+        ]
+
+    def test_complete_other_users_upload(self, user: User, storage: FakeS3Storage):
+        name = f"uploads/{user.pk + 1}/abc/clip.mp4"
+        parts = [{"part_number": 1, "etag": '"a"'}]
+
+        response = post(
+            user,
+            "complete",
+            {"name": name, "upload_id": "upload-1", "parts": parts},
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert storage.client.calls == []
+
+    def test_abort(self, user: User, storage: FakeS3Storage):
+        name = upload_name(user, "clip.mp4")
+
+        response = post(user, "abort", {"name": name, "upload_id": "upload-1"})
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert storage.client.operations() == ["abort_multipart_upload"]
+
+    def test_unavailable_without_s3(self, user: User):
+        response = post(user, "create", {"filename": "clip.mp4", "size": MiB})
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
@@ -7,10 +7,11 @@ from django.views.generic import DetailView
 from django.views.generic import RedirectView
 from django.views.generic import UpdateView
 
+from config.database import NonAtomicReadsMixin
 from {{ cookiecutter.project_slug }}.users.models import User
 
 
-class UserDetailView(LoginRequiredMixin, DetailView):
+class UserDetailView(NonAtomicReadsMixin, LoginRequiredMixin, DetailView):
     model = User
     {%- if cookiecutter.username_type == "email" %}
     slug_field = "id"
@@ -41,7 +42,7 @@ class UserUpdateView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
 user_update_view = UserUpdateView.as_view()
 
 
-class UserRedirectView(LoginRequiredMixin, RedirectView):
+class UserRedirectView(NonAtomicReadsMixin, LoginRequiredMixin, RedirectView):
     permanent = False
 
     def get_redirect_url(self) -> str: